@@ -1,11 +1,12 @@
 """
 签到签退API端点
 """
-from typing import Dict
-from fastapi import APIRouter
+from typing import List
+from fastapi import APIRouter, Depends
 from loguru import logger
 
 from ..core.checkin_service import CheckinService
+from .dependencies import get_checkin_service
 from ..schemas.checkin_models import CheckinResult
 
 router = APIRouter(
@@ -13,15 +14,13 @@ router = APIRouter(
     tags=["checkin"]
 )
 
-checkin_service = CheckinService()
-
 @router.post(
     "/in",
-    response_model=Dict[str, CheckinResult],
+    response_model=List[CheckinResult],
     summary="执行签到",
-    description="为所有已配置token的用户执行签到操作，返回每个用户的签到结果"
+    description="为所有已配置token的用户执行签到操作，按用户顺序返回签到结果列表"
 )
-async def do_checkin():
+async def do_checkin(checkin_service: CheckinService = Depends(get_checkin_service)):
     """执行签到"""
     try:
         return await checkin_service.checkin()
@@ -31,11 +30,11 @@ async def do_checkin():
 
 @router.post(
     "/out",
-    response_model=Dict[str, CheckinResult],
+    response_model=List[CheckinResult],
     summary="执行签退",
-    description="为所有已配置token的用户执行签退操作，返回每个用户的签退结果"
+    description="为所有已配置token的用户执行签退操作，按用户顺序返回签退结果列表"
 )
-async def do_checkout():
+async def do_checkout(checkin_service: CheckinService = Depends(get_checkin_service)):
     """执行签退"""
     try:
         return await checkin_service.checkout()
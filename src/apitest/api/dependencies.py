@@ -0,0 +1,23 @@
+"""
+API依赖注入
+"""
+from fastapi import Request
+
+from ..core.checkin_service import CheckinService
+from ..core.schedule_service import ScheduleService
+from ..core.snipe_service import SnipeService
+
+
+def get_schedule_service(request: Request) -> ScheduleService:
+    """获取应用生命周期内创建的定时预订服务"""
+    return request.app.state.schedule_service
+
+
+def get_snipe_service(request: Request) -> SnipeService:
+    """获取应用生命周期内创建的捡漏服务"""
+    return request.app.state.snipe_service
+
+
+def get_checkin_service(request: Request) -> CheckinService:
+    """获取应用生命周期内创建的签到服务"""
+    return request.app.state.checkin_service
@@ -1,15 +1,20 @@
-from typing import List, Dict, Any
-from fastapi import APIRouter, HTTPException
+import asyncio
+from typing import Dict, Any
+from fastapi import APIRouter
 from loguru import logger
 from datetime import datetime
 
-from ..schemas.request_models import ReservationRequest
-from ..core.seat_reservation import SeatReservation, ReservationResult
+from ..schemas.request_models import ReservationRequest, BatchReservationRequest
+from ..core.seat_reservation import SeatReservation
 from ..config.settings import settings
 from ..utils.helpers import get_target_date
+from ..logging_setup import log_reservation_results
 
 router = APIRouter()
 
+# 预订流程读取全局 settings，同一时间只允许一个请求修改并使用它
+_SETTINGS_LOCK = asyncio.Lock()
+
 
 @router.post("/reserve", response_model=Dict[str, Any])
 async def reserve_seat(request: ReservationRequest) -> Dict[str, Any]:
@@ -25,10 +30,48 @@ async def reserve_seat(request: ReservationRequest) -> Dict[str, Any]:
             "message": str,   # 提示信息
             "results": List[ReservationResult]  # 预订结果列表
         }
+    """
+    return await _process_reservation(request)
+
+
+@router.post("/reserve/batch", response_model=Dict[str, Any])
+async def reserve_seat_batch(request: BatchReservationRequest) -> Dict[str, Any]:
+    """
+    批量座位预订接口，在一次调用中依次处理多个预订请求
+    
+    各请求会查询到相同的空座位，并发执行会争抢同一批座位，因此按顺序执行，
+    后面的请求能看到前面请求已预订的座位
+    
+    Args:
+        request: 批量预订请求参数
         
-    Raises:
-        HTTPException: 当预订过程出现错误时抛出
+    Returns:
+        Dict[str, Any]: {
+            "success": bool,  # 是否全部成功
+            "message": str,   # 提示信息
+            "results": List[Dict[str, Any]],  # 与请求顺序一致的单项预订结果
+            "unserviced": List[int]  # 未成功处理的请求序号
+        }
     """
+    results = [await _process_reservation(item) for item in request.items]
+    unserviced = [i for i, result in enumerate(results) if not result["success"]]
+    
+    return {
+        "success": not unserviced,
+        "message": f"批量预订处理完成: {len(results) - len(unserviced)}/{len(results)} 个请求成功",
+        "results": results,
+        "unserviced": unserviced
+    }
+
+
+async def _process_reservation(request: ReservationRequest) -> Dict[str, Any]:
+    """执行单个预订请求，从更新全局设置到预订结束期间持有设置锁"""
+    async with _SETTINGS_LOCK:
+        return await _run_reservation(request)
+
+
+async def _run_reservation(request: ReservationRequest) -> Dict[str, Any]:
+    """执行单个预订请求，调用方需持有设置锁"""
     try:
         # 更新全局设置
         settings.update_from_request(request)
@@ -52,8 +95,9 @@ async def reserve_seat(request: ReservationRequest) -> Dict[str, Any]:
             }
             
         # 创建预订实例并执行多人预订
+        # 预订流程为阻塞式 HTTP 调用，放到线程中执行以免阻塞事件循环
         reservation = SeatReservation({"token": users_config[0].token})
-        results = reservation.make_reservation(users_config)
+        results = await asyncio.to_thread(reservation.make_reservation, users_config, target_date)
         
         # 如果结果为空，说明没有找到可用时间段或座位
         if not results:
@@ -65,15 +109,7 @@ async def reserve_seat(request: ReservationRequest) -> Dict[str, Any]:
             }
         
         # 记录预订结果
-        for result in results:
-            logger.info(
-                f"用户: {result['user_name']}, "
-                f"日期: {target_date}, "
-                f"时间段: {result['time_period']}, "
-                f"区域: {result['area']}, "
-                f"座位: {result['seat']}, "
-                f"状态: {result['status']}"
-            )
+        log_reservation_results(results, target_date)
         
         return {
             "success": True,
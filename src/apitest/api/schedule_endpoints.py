@@ -2,10 +2,11 @@
 定时预订API端点
 """
 from typing import List
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from loguru import logger
 
 from ..core.schedule_service import ScheduleService
+from .dependencies import get_schedule_service
 from ..schemas.schedule_models import (
     ScheduleConfig,
     ScheduleStatus,
@@ -18,21 +19,15 @@ router = APIRouter(
     tags=["schedule"]
 )
 
-schedule_service = ScheduleService()
-
 @router.get(
     "/status",
     response_model=ScheduleResponse,
     summary="获取定时任务状态",
     description="获取定时预订任务的当前状态，包括配置信息、运行状态和用户token列表"
 )
-async def get_schedule_status():
+async def get_schedule_status(schedule_service: ScheduleService = Depends(get_schedule_service)):
     """获取定时任务状态"""
-    return ScheduleResponse(
-        config=schedule_service.config,
-        status=schedule_service.get_status(),
-        user_tokens=schedule_service.get_user_tokens()
-    )
+    return schedule_service.get_response()
 
 @router.post(
     "/config",
@@ -40,7 +35,10 @@ async def get_schedule_status():
     summary="更新定时任务配置",
     description="更新定时预订任务的配置信息，包括cron表达式和是否启用"
 )
-async def update_schedule_config(config: ScheduleConfig):
+async def update_schedule_config(
+    config: ScheduleConfig,
+    schedule_service: ScheduleService = Depends(get_schedule_service)
+):
     """更新定时任务配置"""
     try:
         schedule_service.config = config
@@ -48,7 +46,7 @@ async def update_schedule_config(config: ScheduleConfig):
             await schedule_service.start()
         else:
             await schedule_service.stop()
-        return await get_schedule_status()
+        return schedule_service.get_response()
     except Exception as e:
         logger.error(f"更新定时任务配置失败: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -59,12 +57,12 @@ async def update_schedule_config(config: ScheduleConfig):
     summary="启动定时任务",
     description="启动定时预订任务"
 )
-async def start_schedule():
+async def start_schedule(schedule_service: ScheduleService = Depends(get_schedule_service)):
     """启动定时任务"""
     try:
         schedule_service.config.enabled = True
         await schedule_service.start()
-        return await get_schedule_status()
+        return schedule_service.get_response()
     except Exception as e:
         logger.error(f"启动定时任务失败: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -75,12 +73,12 @@ async def start_schedule():
     summary="停止定时任务",
     description="停止定时预订任务"
 )
-async def stop_schedule():
+async def stop_schedule(schedule_service: ScheduleService = Depends(get_schedule_service)):
     """停止定时任务"""
     try:
         schedule_service.config.enabled = False
         await schedule_service.stop()
-        return await get_schedule_status()
+        return schedule_service.get_response()
     except Exception as e:
         logger.error(f"停止定时任务失败: {str(e)}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -91,7 +89,7 @@ async def stop_schedule():
     summary="获取用户token列表",
     description="获取所有已保存的用户token信息"
 )
-async def get_user_tokens():
+async def get_user_tokens(schedule_service: ScheduleService = Depends(get_schedule_service)):
     """获取用户token列表"""
     return schedule_service.get_user_tokens()
 
@@ -101,7 +99,10 @@ async def get_user_tokens():
     summary="更新用户token列表",
     description="更新整个用户token列表"
 )
-async def update_user_tokens(tokens: List[UserToken]):
+async def update_user_tokens(
+    tokens: List[UserToken],
+    schedule_service: ScheduleService = Depends(get_schedule_service)
+):
     """更新用户token列表"""
     try:
         schedule_service.update_user_tokens(tokens)
@@ -116,7 +117,10 @@ async def update_user_tokens(tokens: List[UserToken]):
     summary="添加用户token",
     description="添加或更新单个用户的token信息"
 )
-async def add_user_token(token: UserToken):
+async def add_user_token(
+    token: UserToken,
+    schedule_service: ScheduleService = Depends(get_schedule_service)
+):
     """添加用户token"""
     try:
         schedule_service.add_user_token(token)
@@ -131,7 +135,10 @@ async def add_user_token(token: UserToken):
     summary="删除用户token",
     description="删除指定用户的token信息"
 )
-async def remove_user_token(name: str):
+async def remove_user_token(
+    name: str,
+    schedule_service: ScheduleService = Depends(get_schedule_service)
+):
     """删除用户token"""
     try:
         schedule_service.remove_user_token(name)
@@ -1,13 +1,16 @@
 """
 座位捡漏API端点
 """
+import asyncio
 from datetime import date
+from functools import lru_cache
 from typing import List
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from loguru import logger
 
 from ..core.snipe_service import SnipeService
+from .dependencies import get_snipe_service
 from ..schemas.snipe_models import (
     SnipeTask,
     CreateSnipeTaskRequest,
@@ -21,7 +24,12 @@ router = APIRouter(
     prefix="/snipe", 
     tags=["snipe"]
 )
-snipe_service = SnipeService()
+
+
+@lru_cache(maxsize=256)
+def _parse_date(value: str) -> date:
+    """解析 YYYY-MM-DD 格式的日期"""
+    return date.fromisoformat(value)
 
 
 @router.post(
@@ -30,7 +38,10 @@ snipe_service = SnipeService()
     summary="创建捡漏任务",
     description="创建一个或多个捡漏任务，支持同一天为多个用户创建任务"
 )
-async def create_snipe_tasks(request: CreateSnipeTaskRequest):
+async def create_snipe_tasks(
+    request: CreateSnipeTaskRequest,
+    snipe_service: SnipeService = Depends(get_snipe_service)
+):
     """
     创建捡漏任务
     
@@ -38,25 +49,42 @@ async def create_snipe_tasks(request: CreateSnipeTaskRequest):
     - 如果任务已存在(相同用户+日期)，则返回已存在的任务
     - 任务创建后会立即开始执行捡漏
     """
-    tasks = []
-    for task_info in request.tasks:
-        try:
-            target_date = date.fromisoformat(task_info.target_date)
-            logger.debug(
-                f"日期转换: "
-                f"输入字符串={task_info.target_date}, "
-                f"转换结果={target_date} ({type(target_date)})"
-            )
-            
-            task = await snipe_service.create_task(
+    try:
+        target_dates = [_parse_date(t.target_date) for t in request.tasks]
+    except ValueError as e:
+        logger.error(f"日期转换失败: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    for task_info, target_date in zip(request.tasks, target_dates):
+        logger.opt(lazy=True).debug(
+            "日期转换: 输入字符串={}, 转换结果={}",
+            lambda: task_info.target_date,
+            lambda: target_date
+        )
+    
+    # 并发创建任务，结果顺序与请求顺序一致
+    results = await asyncio.gather(
+        *(
+            snipe_service.create_task(
                 user_token=task_info.user_token,
                 user_name=task_info.user_name,
                 target_date=target_date
             )
-            tasks.append(task)
-        except ValueError as e:
-            logger.error(f"日期转换或创建任务失败: {str(e)}")
-            raise HTTPException(status_code=400, detail=str(e))
+            for task_info, target_date in zip(request.tasks, target_dates)
+        ),
+        return_exceptions=True
+    )
+    
+    for result in results:
+        if isinstance(result, BaseException) and not isinstance(result, ValueError):
+            raise result
+    
+    errors = [str(r) for r in results if isinstance(r, ValueError)]
+    if errors:
+        logger.error(f"创建任务失败: {errors}")
+        raise HTTPException(status_code=400, detail="; ".join(errors))
+    
+    tasks = list(results)
     return SnipeTaskResponse(tasks=tasks)
 
 
@@ -66,7 +94,7 @@ async def create_snipe_tasks(request: CreateSnipeTaskRequest):
     summary="查询活动中的捡漏任务",
     description="获取所有正在进行中的捡漏任务列表"
 )
-async def get_active_tasks():
+async def get_active_tasks(snipe_service: SnipeService = Depends(get_snipe_service)):
     """
     获取所有活动中的捡漏任务
     
@@ -83,7 +111,10 @@ async def get_active_tasks():
     summary="停止捡漏任务",
     description="停止一个或多个捡漏任务"
 )
-async def stop_snipe_tasks(request: StopSnipeTaskRequest):
+async def stop_snipe_tasks(
+    request: StopSnipeTaskRequest,
+    snipe_service: SnipeService = Depends(get_snipe_service)
+):
     """
     停止指定的捡漏任务
     
@@ -1,11 +1,76 @@
 """
 应用配置模块
 """
-from typing import Dict, List, Any, Optional
+from collections import defaultdict
+from functools import lru_cache
+import os
+import threading
+from typing import Dict, List, Any, Optional, Tuple
 from pathlib import Path
+import orjson
 import yaml
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
+
+# 优先使用 libyaml 提供的 C 实现加载器，未安装时退回纯 Python 实现
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+
+def parse_yaml(stream: Any) -> Any:
+    """以安全模式解析 YAML 内容"""
+    return yaml.load(stream, Loader=_YamlLoader)
+
+
+def check_yaml_syntax(stream: Any) -> None:
+    """只检查 YAML 语法，逐个消费解析事件而不构造 Python 对象，格式错误时抛出 yaml.YAMLError"""
+    for _ in yaml.parse(stream, Loader=_YamlLoader):
+        pass
+
+
+# 设置为 1 时启用配置文件的 JSON 副本，默认关闭，不会在包目录下生成文件
+CONFIG_JSON_CACHE_ENV = "APITEST_CONFIG_JSON_CACHE"
+
+
+@lru_cache(maxsize=4)
+def _read_yaml(path: str, mtime_ns: int, size: int, use_json_cache: bool = False) -> Dict[str, Any]:
+    """解析 YAML 文件，按路径、修改时间和大小缓存
+
+    use_json_cache 为真时，解析结果连同源文件的修改时间和大小另存为同目录下的 JSON 副本，
+    两者与当前文件完全一致时后续进程直接读取副本，JSON 的解析远快于 YAML。
+    副本不匹配或读写失败时退回解析 YAML。
+    """
+    if not use_json_cache:
+        return parse_yaml(Path(path).read_bytes()) or {}
+    
+    source = {"mtime_ns": mtime_ns, "size": size}
+    cache_path = Path(path + ".cache.json")
+    try:
+        cached = orjson.loads(cache_path.read_bytes())
+        if isinstance(cached, dict) and cached.get("source") == source:
+            return cached["config"]
+    except (OSError, orjson.JSONDecodeError, KeyError):
+        pass
+    
+    # 一次读入整个文件交给解析器，libyaml 自行识别编码
+    config = parse_yaml(Path(path).read_bytes()) or {}
+    _write_json_cache(cache_path, source, config)
+    return config
+
+
+def _write_json_cache(cache_path: Path, source: Dict[str, int], config: Dict[str, Any]) -> None:
+    """原子写入配置的 JSON 副本，内容无法无损转换为 JSON 时不写入"""
+    try:
+        payload = orjson.dumps({"source": source, "config": config})
+        if orjson.loads(payload)["config"] != config:
+            return  # 例如 YAML 中的日期会被转成字符串
+        tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError):
+        pass
 
 
 def load_yaml_config() -> Dict[str, Any]:
@@ -14,8 +79,45 @@ def load_yaml_config() -> Dict[str, Any]:
     if not config_path.exists():
         return {}
     
-    with open(config_path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
+    stat = config_path.stat()
+    use_json_cache = os.environ.get(CONFIG_JSON_CACHE_ENV) == "1"
+    return _read_yaml(str(config_path), stat.st_mtime_ns, stat.st_size, use_json_cache)
+
+
+def _settings_from_yaml(yaml_config: Dict[str, Any]) -> Dict[str, Any]:
+    """将 YAML 配置展开为 Settings 字段"""
+    values: Dict[str, Any] = {}
+    
+    if "api" in yaml_config:
+        api = yaml_config["api"]
+        values.update(
+            api_base_url=api["base_url"].rstrip("/"),
+            floor_id=api["floor_id"],
+            library_id=api["library_id"],
+            seat_reservation_type=api["seat_reservation_type"],
+            period_reservation_type=api["period_reservation_type"],
+            reservation_interval=api["reservation_interval"]
+        )
+    
+    if "area_priority" in yaml_config:
+        values["area_priority"] = yaml_config["area_priority"]
+    
+    if "logging" in yaml_config:
+        log_config = yaml_config["logging"]
+        values.update(
+            log_level=log_config["level"],
+            log_rotation=log_config["rotation"],
+            log_retention=log_config["retention"],
+            log_encoding=log_config["encoding"]
+        )
+    
+    if "reservation" in yaml_config:
+        values["days_ahead"] = yaml_config["reservation"]["days_ahead"]
+    
+    if "snipe_interval" in yaml_config:
+        values["snipe_interval"] = yaml_config["snipe_interval"]
+    
+    return values
 
 
 class Settings(BaseSettings):
@@ -43,8 +145,8 @@ class Settings(BaseSettings):
     # 捡漏配置
     snipe_interval: int = 60  # 捡漏频率(秒)
     
-    # 共享座位记录
-    shared_seat_records: Dict[str, Dict[str, Dict[str, Dict[str, List[str]]]]] = {}
+    # 上一次应用的请求配置
+    _last_request_key: Optional[Tuple[Any, ...]] = PrivateAttr(default=None)
     
     def update_from_request(self, request: "ReservationRequest") -> None:
         """从请求更新配置
@@ -52,6 +154,16 @@ class Settings(BaseSettings):
         Args:
             request: API请求对象
         """
+        # 请求配置与上次相同时跳过更新
+        request_key = (
+            tuple(request.api.model_dump().values()) if request.api else None,
+            tuple(request.area_priority),
+            request.reservation.days_ahead if request.reservation else None
+        )
+        if request_key == self._last_request_key:
+            return
+        self._last_request_key = request_key
+        
         # 只有在请求中提供了相应的配置时才更新
         if request.api:
             self.api_base_url = request.api.base_url
@@ -74,36 +186,8 @@ class Settings(BaseSettings):
     )
 
 
-# 加载 YAML 配置
-yaml_config = load_yaml_config()
-
-# 创建设置实例
-settings = Settings()
-
-# 从 YAML 配置更新设置
-if yaml_config:
-    if "api" in yaml_config:
-        settings.api_base_url = yaml_config["api"]["base_url"].rstrip("/")
-        settings.floor_id = yaml_config["api"]["floor_id"]
-        settings.library_id = yaml_config["api"]["library_id"]
-        settings.seat_reservation_type = yaml_config["api"]["seat_reservation_type"]
-        settings.period_reservation_type = yaml_config["api"]["period_reservation_type"]
-        settings.reservation_interval = yaml_config["api"]["reservation_interval"]
-    
-    if "area_priority" in yaml_config:
-        settings.area_priority = yaml_config["area_priority"]
-    
-    if "logging" in yaml_config:
-        settings.log_level = yaml_config["logging"]["level"]
-        settings.log_rotation = yaml_config["logging"]["rotation"]
-        settings.log_retention = yaml_config["logging"]["retention"]
-        settings.log_encoding = yaml_config["logging"]["encoding"]
-    
-    if "reservation" in yaml_config:
-        settings.days_ahead = yaml_config["reservation"]["days_ahead"]
-    
-    if "snipe_interval" in yaml_config:
-        settings.snipe_interval = yaml_config["snipe_interval"]
+# 创建设置实例，YAML 配置优先于默认值和环境变量
+settings = Settings(**_settings_from_yaml(load_yaml_config()))
 
 # 避免循环导入
 from ..schemas.request_models import ReservationRequest
@@ -112,5 +196,43 @@ from ..schemas.request_models import ReservationRequest
 DAYS_AHEAD: int = 6
 
 # 共享座位记录
-# 格式: {日期: {时间段: {区域: {桌号: [座位号]}}}}
-SHARED_SEAT_RECORDS: Dict[str, Dict[str, Dict[str, Dict[str, List[str]]]]] = {} 
\ No newline at end of file
+# 格式: {(日期, 时间段, 区域, 桌号): [座位号]}
+SHARED_SEAT_RECORDS: Dict[Tuple[str, str, str, str], List[str]] = defaultdict(list)
+
+# 按区域建立的桌号索引，与 SHARED_SEAT_RECORDS 共享座位号列表
+# 格式: {(日期, 时间段, 区域): {桌号: [座位号]}}
+_AREA_TABLE_INDEX: Dict[Tuple[str, str, str], Dict[str, List[str]]] = defaultdict(dict)
+
+# 预订可能在多个线程中并发执行，写入和读取共享座位记录时需持有此锁
+_SEAT_RECORDS_LOCK = threading.Lock()
+
+
+def record_seat(date: str, period: str, area: str, table: str, seat: str) -> None:
+    """记录已预订的座位
+    
+    Args:
+        date: 日期
+        period: 时间段
+        area: 区域名称
+        table: 桌号
+        seat: 座位号
+    """
+    with _SEAT_RECORDS_LOCK:
+        seats = SHARED_SEAT_RECORDS[(date, period, area, table)]
+        seats.append(seat)
+        _AREA_TABLE_INDEX[(date, period, area)][table] = seats
+
+
+def get_booked_tables(date: str, period: str, area: str) -> Dict[str, List[str]]:
+    """获取指定日期、时间段、区域中已有预订的桌子
+    
+    Args:
+        date: 日期
+        period: 时间段
+        area: 区域名称
+        
+    Returns:
+        {桌号: [座位号]}
+    """
+    with _SEAT_RECORDS_LOCK:
+        return dict(_AREA_TABLE_INDEX.get((date, period, area), {}))
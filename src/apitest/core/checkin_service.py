@@ -1,107 +1,175 @@
 """
 签到服务
 """
+import asyncio
+import time
+from bisect import bisect_right
 from datetime import datetime, date
-from typing import Dict, List, Optional
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple
 import httpx
+import orjson
 from loguru import logger
 
 from ..schemas.schedule_models import UserToken
 from ..schemas.checkin_models import CheckinResult
 from ..core.schedule_service import ScheduleService
 from ..config.settings import settings
+from ..http_client import get_client
+
+# 预约列表缓存有效期（秒）
+RESERVATION_CACHE_TTL = 30
+
+# 签到时需要过滤的预约状态
+CHECKIN_FILTERED_STATUS = frozenset({
+    "已取消",  # reservation_status_cancel
+    "已失效",  # reservation_status_break_promise
+    "自动签退"  # reservation_status_system_close
+})
+# 签退时额外过滤"已签退"状态
+CHECKOUT_FILTERED_STATUS = CHECKIN_FILTERED_STATUS | {"已签退"}  # reservation_status_sign_out
+
+
+def _time_on(day: date, hhmm: str) -> datetime:
+    """将 HH:MM 格式的时间与日期组合为 datetime，避免使用较慢的 strptime"""
+    hour, minute = hhmm.split(":")
+    return datetime(day.year, day.month, day.day, int(hour), int(minute))
 
 
 class CheckinService:
     """签到服务"""
     
-    _instance = None
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._initialized = False
-        return cls._instance
-    
-    def __init__(self):
-        if not self._initialized:
-            self.schedule_service = ScheduleService()  # 这里会获取到已存在的实例
-            self.base_url = settings.api_base_url
-            self._initialized = True
+    def __init__(self, schedule_service: ScheduleService):
+        """
+        初始化签到服务
         
-    async def _get_reservation_list(self, token: str) -> List[Dict]:
-        """获取预约列表"""
-        headers = {
-            "token": token
-        }
+        Args:
+            schedule_service: 提供用户token的定时预订服务
+        """
+        self.schedule_service = schedule_service
+        self.base_url = settings.api_base_url
+        # (token, 日期) -> (获取时间, 按日期索引的预约)，写入时清理过去日期的条目
+        self._reservation_cache: Dict[Tuple[str, str], Tuple[float, Dict[str, List[Dict]]]] = {}
+        # 单次签到/签退批次内的获取任务，同一token并发获取时共享结果
+        self._tick_cache: Dict[Tuple[str, str], "asyncio.Task[Dict[str, List[Dict]]]"] = {}
         
-        all_content = []
-        page = 1
-        page_size = 50  # 增加每页大小
+    async def _fetch_page(self, token: str, page: int, page_size: int = 50) -> Tuple[List[Dict], int]:
+        """
+        获取预约列表的指定页
         
-        while True:
-            data = {
-                "status": 0,  # 0表示未完结的预约
-                "size": page_size,
-                "page": page,
-                "libraryId": 1  # 图书馆ID
-            }
+        Args:
+            token: 用户token
+            page: 页码，从1开始
+            page_size: 每页条数
             
-            logger.debug(f"获取预约列表: 第{page}页, 每页{page_size}条")
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.base_url}/eastLibReservation/reservation/myReservationList",
-                    headers=headers,
-                    json=data
-                )
-                logger.debug(f"预约列表接口响应: {response.text}")
-                result = response.json()
-                if result["resultStatus"]["code"] != 0:
-                    error_msg = result["resultStatus"]["message"]
-                    logger.error(f"获取预约列表失败: {error_msg}")
-                    raise Exception(f"获取预约列表失败: {error_msg}")
-                
-                content = result["resultValue"]["content"]
-                total_pages = result["resultValue"]["totalPages"]
-                
-                logger.debug(f"获取到第{page}页数据: {len(content)}条记录")
+        Returns:
+            (当前页内容, 总页数)
+        """
+        data = {
+            "status": 0,  # 0表示未完结的预约
+            "size": page_size,
+            "page": page,
+            "libraryId": 1  # 图书馆ID
+        }
+        
+        logger.debug("获取预约列表: 第{}页, 每页{}条", page, page_size)
+        
+        response = await get_client().post(
+            f"{self.base_url}/eastLibReservation/reservation/myReservationList",
+            headers=self._headers(token),
+            json=data
+        )
+        logger.opt(lazy=True).debug("预约列表接口响应: {}", lambda: response.text)
+        result = orjson.loads(response.content)
+        if result["resultStatus"]["code"] != 0:
+            error_msg = result["resultStatus"]["message"]
+            logger.error(f"获取预约列表失败: {error_msg}")
+            raise Exception(f"获取预约列表失败: {error_msg}")
+        
+        content = result["resultValue"]["content"]
+        logger.debug("获取到第{}页数据: {}条记录", page, len(content))
+        return content, result["resultValue"]["totalPages"]
+        
+    @staticmethod
+    def _headers(token: str) -> Dict[str, str]:
+        """构造请求头，接口只需携带用户token"""
+        return {"token": token}
+        
+    def invalidate(self, token: str) -> None:
+        """使指定用户的预约列表缓存失效"""
+        key = (token, date.today().isoformat())
+        self._reservation_cache.pop(key, None)
+        self._tick_cache.pop(key, None)
+        
+    def clear_tick_cache(self) -> None:
+        """清空批次内缓存，在每次签到/签退批次开始前调用"""
+        self._tick_cache.clear()
+        
+    async def _get_reservation_list(self, token: str, today: str) -> Dict[str, List[Dict]]:
+        """获取按日期索引的预约列表，同一批次内共享，短时间内重复获取时使用缓存"""
+        key = (token, today)
+        task = self._tick_cache.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._get_cached_reservation_list(key))
+            self._tick_cache[key] = task
+        return await task
+        
+    async def _get_cached_reservation_list(self, key: Tuple[str, str]) -> Dict[str, List[Dict]]:
+        """在有效期内复用缓存的预约列表，否则重新获取"""
+        now = time.monotonic()
+        entry = self._reservation_cache.get(key)
+        if entry is not None and now - entry[0] < RESERVATION_CACHE_TTL:
+            logger.debug("使用缓存的预约列表")
+            return entry[1]
+        
+        token = key[0]
+        all_content = await self._fetch_reservation_list(token)
+        # 同一日期可能跨页出现，合并到同一列表
+        by_date: Dict[str, List[Dict]] = {}
+        for group in all_content:
+            by_date.setdefault(group["reservationDate"], []).extend(group["reservationList"])
+        self._prune_reservation_cache(key[1])
+        self._reservation_cache[key] = (now, by_date)
+        return by_date
+        
+    def _prune_reservation_cache(self, today: str) -> None:
+        """移除早于 today 的缓存，日期为 YYYY-MM-DD 格式，可直接按字符串比较"""
+        stale = [key for key in self._reservation_cache if key[1] < today]
+        for key in stale:
+            del self._reservation_cache[key]
+        
+    async def _fetch_reservation_list(self, token: str) -> List[Dict]:
+        """获取预约列表，首页返回总页数后并发获取其余页"""
+        all_content, total_pages = await self._fetch_page(token, 1)
+        
+        if total_pages > 1:
+            rest = await asyncio.gather(
+                *(self._fetch_page(token, page) for page in range(2, total_pages + 1))
+            )
+            for content, _ in rest:
                 all_content.extend(content)
-                
-                if page >= total_pages:
-                    break
-                    
-                page += 1
         
-        logger.debug(f"总共获取到{len(all_content)}条预约记录")
+        logger.debug("总共获取到{}条预约记录", len(all_content))
         return all_content
             
     async def _do_checkin(self, token: str, reservation_id: str) -> bool:
         """执行签到"""
-        headers = {
-            "token": token
-        }
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/eastLibReservation/seatReservation/commonSignIn",
-                headers=headers,
-                params={"reservationId": reservation_id}
-            )
-            logger.debug(f"签到接口响应: {response.text}")
-            result = response.json()
-            if result["resultStatus"]["code"] != 0:
-                error_msg = result["resultStatus"]["message"]
-                logger.error(f"签到失败: {error_msg}")
-                raise Exception(f"签到失败: {error_msg}")
-            return True
+        response = await get_client().get(
+            f"{self.base_url}/eastLibReservation/seatReservation/commonSignIn",
+            headers=self._headers(token),
+            params={"reservationId": reservation_id}
+        )
+        logger.opt(lazy=True).debug("签到接口响应: {}", lambda: response.text)
+        result = orjson.loads(response.content)
+        if result["resultStatus"]["code"] != 0:
+            error_msg = result["resultStatus"]["message"]
+            logger.error(f"签到失败: {error_msg}")
+            raise Exception(f"签到失败: {error_msg}")
+        return True
             
     async def _do_checkout(self, token: str, reservation_id: str) -> bool:
         """执行签退"""
-        headers = {
-            "token": token
-        }
-        
+        headers = self._headers(token)
         logger.info(f"开始签退预约: ID={reservation_id}")
         logger.info(f"签退请求头: {headers}")
         
@@ -110,227 +178,161 @@ class CheckinService:
         logger.info(f"签退请求参数: reservationId={reservation_id}")
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:  # 设置30秒超时
-                try:
-                    logger.info("正在发送签退请求...")
-                    response = await client.get(
-                        url,
-                        headers=headers,
-                        params={"reservationId": reservation_id}
-                    )
-                    
-                    # 记录原始响应内容
-                    logger.info(f"签退接口响应状态码: {response.status_code}")
-                    logger.info(f"签退接口响应头: {dict(response.headers)}")
-                    logger.info(f"签退接口原始响应内容: {response.text}")
-                    
-                    if response.status_code != 200:
-                        logger.error(f"签退请求失败，HTTP状态码: {response.status_code}")
-                        raise Exception(f"签退请求失败，HTTP状态码: {response.status_code}")
-                    
-                except httpx.RequestError as e:
-                    logger.error(f"签退接口请求失败: {str(e)}")
-                    raise Exception(f"签退接口请求失败: {str(e)}")
+            try:
+                logger.info("正在发送签退请求...")
+                response = await get_client().get(
+                    url,
+                    headers=headers,
+                    params={"reservationId": reservation_id},
+                    timeout=30.0  # 设置30秒超时
+                )
                 
-                # 尝试解析JSON
-                try:
-                    logger.info("正在解析响应JSON...")
-                    result = response.json()
-                    logger.info(f"解析后的响应数据: {result}")
-                except Exception as e:
-                    logger.error(f"签退接口响应解析JSON失败: {str(e)}, 响应内容: {response.text}")
-                    raise Exception(f"签退接口返回格式错误: {response.text}")
+                # 记录原始响应内容
+                logger.info(f"签退接口响应状态码: {response.status_code}")
+                logger.info(f"签退接口响应头: {dict(response.headers)}")
+                logger.info(f"签退接口原始响应内容: {response.text}")
                 
-                if result["resultStatus"]["code"] != 0:
-                    error_msg = result["resultStatus"]["message"]
-                    logger.error(f"签退失败: {error_msg}")
-                    raise Exception(f"签退失败: {error_msg}")
-                    
-                logger.info("签退成功")
-                return True
+                if response.status_code != 200:
+                    logger.error(f"签退请求失败，HTTP状态码: {response.status_code}")
+                    raise Exception(f"签退请求失败，HTTP状态码: {response.status_code}")
                 
+            except httpx.RequestError as e:
+                logger.error(f"签退接口请求失败: {str(e)}")
+                raise Exception(f"签退接口请求失败: {str(e)}")
+            
+            # 尝试解析JSON
+            try:
+                logger.info("正在解析响应JSON...")
+                result = orjson.loads(response.content)
+                logger.info(f"解析后的响应数据: {result}")
+            except Exception as e:
+                logger.error(f"签退接口响应解析JSON失败: {str(e)}, 响应内容: {response.text}")
+                raise Exception(f"签退接口返回格式错误: {response.text}")
+            
+            if result["resultStatus"]["code"] != 0:
+                error_msg = result["resultStatus"]["message"]
+                logger.error(f"签退失败: {error_msg}")
+                raise Exception(f"签退失败: {error_msg}")
+                
+            logger.info("签退成功")
+            return True
+            
         except Exception as e:
             logger.error(f"签退时发生错误: {str(e)}")
             raise
             
-    def _get_closest_reservation(self, reservations: List[Dict], for_checkout: bool = False) -> Optional[Dict]:
-        """获取最接近当前时间的预约信息"""
+    def _get_closest_reservation(
+        self,
+        reservations: Dict[str, List[Dict]],
+        today: str,
+        for_checkout: bool = False
+    ) -> Optional[Dict]:
+        """获取最接近当前时间的预约信息，today 为 YYYY-MM-DD 格式的当天日期"""
         now = datetime.now()
-        today = date.today().strftime("%Y-%m-%d")
-        closest_reservation = None
-        min_time_diff = float('inf')
+        today_date = date.fromisoformat(today)
         
-        # 基础需要过滤的状态
-        filtered_status = {
-            "已取消",  # reservation_status_cancel
-            "已失效",  # reservation_status_break_promise
-            "自动签退"  # reservation_status_system_close
-        }
+        filtered_status = CHECKOUT_FILTERED_STATUS if for_checkout else CHECKIN_FILTERED_STATUS
         
-        # 如果是签退操作，额外过滤"已签退"状态
-        if for_checkout:
-            filtered_status.add("已签退")  # reservation_status_sign_out
-            logger.debug("签退操作：额外过滤'已签退'状态")
+        logger.debug("当前时间: {}, 今天日期: {}", now, today)
+        logger.debug("查找{}预约", "签退" if for_checkout else "签到")
+        logger.debug("需要过滤的状态: {}", filtered_status)
         
-        logger.debug(f"当前时间: {now}, 今天日期: {today}")
-        logger.debug(f"查找{'签退' if for_checkout else '签到'}预约")
-        logger.debug(f"需要过滤的状态: {filtered_status}")
+        # 过滤掉不可用状态的预约，并解析起止时间
+        candidates = [
+            (reservation,
+             _time_on(today_date, reservation["startTime"]),
+             _time_on(today_date, reservation["endTime"]))
+            for reservation in reservations.get(today, [])
+            if reservation["reservationStatusName"] not in filtered_status
+        ]
         
-        for date_group in reservations:
-            logger.debug(f"检查日期组: {date_group['reservationDate']}")
-            if date_group["reservationDate"] != today:
-                logger.debug(f"跳过非今天的日期: {date_group['reservationDate']}")
-                continue
-                
-            for reservation in date_group["reservationList"]:
-                # 跳过不可用状态的预约
-                status_name = reservation["reservationStatusName"]
-                if status_name in filtered_status:
-                    logger.debug(f"跳过{status_name}的预约: ID={reservation['reservationId']}, 座位={reservation['seatNo']}, 时间={reservation['startTime']}-{reservation['endTime']}")
-                    continue
-                    
-                logger.debug(f"检查预约: ID={reservation['reservationId']}, 状态={status_name}, 座位={reservation['seatNo']}, 时间={reservation['startTime']}-{reservation['endTime']}")
-                    
-                reservation_time = datetime.strptime(
-                    f"{reservation['reservationDate']} {reservation['startTime']}",
-                    "%Y-%m-%d %H:%M"
-                )
-                end_time = datetime.strptime(
-                    f"{reservation['reservationDate']} {reservation['endTime']}",
-                    "%Y-%m-%d %H:%M"
-                )
-                
-                if for_checkout:
-                    # 对于签退，我们需要找到包含当前时间或最接近当前时间的预约
-                    logger.debug(
-                        f"检查预约时段: {reservation['startTime']}-{reservation['endTime']}, "
-                        f"预约ID: {reservation['reservationId']}, "
-                        f"开始时间: {reservation_time}, "
-                        f"结束时间: {end_time}, "
-                        f"当前时间: {now}, "
-                        f"状态: {status_name}, "
-                        f"是否在时间段内: {reservation_time <= now <= end_time}"
-                    )
-                    if reservation_time <= now <= end_time:
-                        logger.debug(f"找到当前时间段内的预约: {reservation['reservationId']}")
-                        return reservation
-                else:
-                    # 对于签到，只考虑结束时间还未到的预约
-                    if end_time <= now:
-                        logger.debug(f"跳过已过结束时间的预约: ID={reservation['reservationId']}, 结束时间={end_time}")
-                        continue
-                        
-                    time_diff = abs((reservation_time - now).total_seconds())
-                    if time_diff < min_time_diff:
-                        min_time_diff = time_diff
-                        closest_reservation = reservation
-                        logger.debug(f"更新最接近的预约: {reservation['reservationId']}, 时间差: {time_diff}秒")
+        if for_checkout:
+            # 对于签退，找到包含当前时间的预约：按开始时间排序后二分查找最后一个已开始的预约
+            candidates.sort(key=itemgetter(1))
+            idx = bisect_right([start for _, start, _ in candidates], now) - 1
+            closest_reservation = None
+            if idx >= 0 and now <= candidates[idx][2]:
+                closest_reservation = candidates[idx][0]
+        else:
+            # 对于签到，只考虑结束时间还未到的预约，取开始时间最接近当前时间的
+            closest = min(
+                ((reservation, start) for reservation, start, end in candidates if end > now),
+                key=lambda item: abs((item[1] - now).total_seconds()),
+                default=None
+            )
+            closest_reservation = closest[0] if closest else None
                     
         if closest_reservation:
-            logger.debug(f"返回最接近的预约: {closest_reservation['reservationId']}")
+            logger.debug("返回最接近的预约: {}", closest_reservation["reservationId"])
         else:
             logger.debug("没有找到符合条件的预约")
             
         return closest_reservation
             
-    async def checkin(self) -> Dict[str, CheckinResult]:
-        """执行签到"""
-        results = {}
-        tokens = self.schedule_service.get_user_tokens()
-        
-        for token_info in tokens:
-            try:
-                # 获取预约列表
-                reservations = await self._get_reservation_list(token_info.token)
-                
-                # 获取最近的预约
-                reservation = self._get_closest_reservation(reservations)
-                if not reservation:
-                    results[token_info.name] = CheckinResult(
-                        user_name=token_info.name,
-                        date=date.today().strftime("%Y-%m-%d"),
-                        time_period="未知",
-                        success=False,
-                        message="签到失败",
-                        error_reason="没有找到今天的预约"
-                    )
-                    continue
-                
-                # 执行签到
-                await self._do_checkin(token_info.token, str(reservation["reservationId"]))
-                
-                # 记录成功结果
-                results[token_info.name] = CheckinResult(
-                    user_name=token_info.name,
-                    date=reservation["reservationDate"],
-                    time_period=f"{reservation['startTime']}-{reservation['endTime']}",
-                    success=True,
-                    message="签到成功"
-                )
-                
-            except Exception as e:
-                error_msg = str(e)
-                logger.error(f"用户 {token_info.name} 签到时出错: {error_msg}")
-                
-                # 记录失败结果
-                results[token_info.name] = CheckinResult(
+    async def _process_user(self, token_info: UserToken, today: str, for_checkout: bool) -> CheckinResult:
+        """为单个用户执行签到或签退"""
+        action = "签退" if for_checkout else "签到"
+        try:
+            # 获取预约列表
+            reservations = await self._get_reservation_list(token_info.token, today)
+            
+            # 获取最近的预约（签退时为当前时间段的预约）
+            reservation = self._get_closest_reservation(reservations, today, for_checkout=for_checkout)
+            if not reservation:
+                return CheckinResult(
                     user_name=token_info.name,
-                    date=date.today().strftime("%Y-%m-%d"),
+                    date=today,
                     time_period="未知",
                     success=False,
-                    message="签到失败",
-                    error_reason=error_msg
+                    message=f"{action}失败",
+                    error_reason="没有找到当前可签退的预约" if for_checkout else "没有找到今天的预约"
                 )
-                
-        return results
-        
-    async def checkout(self) -> Dict[str, CheckinResult]:
-        """执行签退"""
-        results = {}
+            
+            # 执行签到/签退
+            if for_checkout:
+                await self._do_checkout(token_info.token, str(reservation["reservationId"]))
+            else:
+                await self._do_checkin(token_info.token, str(reservation["reservationId"]))
+            # 预约状态已变化，缓存的列表不再可用
+            self.invalidate(token_info.token)
+            
+            # 记录成功结果
+            return CheckinResult(
+                user_name=token_info.name,
+                date=reservation["reservationDate"],
+                time_period=f"{reservation['startTime']}-{reservation['endTime']}",
+                success=True,
+                message=f"{action}成功"
+            )
+            
+        except Exception as e:
+            error_msg = str(e)
+            logger.error(f"用户 {token_info.name} {action}时出错: {error_msg}")
+            
+            # 记录失败结果
+            return CheckinResult(
+                user_name=token_info.name,
+                date=today,
+                time_period="未知",
+                success=False,
+                message=f"{action}失败",
+                error_reason=error_msg
+            )
+            
+    async def checkin(self) -> List[CheckinResult]:
+        """执行签到，所有用户并发处理"""
+        self.clear_tick_cache()
+        today = date.today().isoformat()
         tokens = self.schedule_service.get_user_tokens()
+        return list(await asyncio.gather(
+            *(self._process_user(token_info, today, for_checkout=False) for token_info in tokens)
+        ))
         
-        for token_info in tokens:
-            try:
-                # 获取预约列表
-                reservations = await self._get_reservation_list(token_info.token)
-                
-                # 获取当前时间段的预约
-                reservation = self._get_closest_reservation(reservations, for_checkout=True)
-                if not reservation:
-                    results[token_info.name] = CheckinResult(
-                        user_name=token_info.name,
-                        date=date.today().strftime("%Y-%m-%d"),
-                        time_period="未知",
-                        success=False,
-                        message="签退失败",
-                        error_reason="没有找到当前可签退的预约"
-                    )
-                    continue
-                
-                # 执行签退
-                await self._do_checkout(token_info.token, str(reservation["reservationId"]))
-                
-                # 记录成功结果
-                results[token_info.name] = CheckinResult(
-                    user_name=token_info.name,
-                    date=reservation["reservationDate"],
-                    time_period=f"{reservation['startTime']}-{reservation['endTime']}",
-                    success=True,
-                    message="签退成功"
-                )
-                
-            except Exception as e:
-                error_msg = str(e)
-                logger.error(f"用户 {token_info.name} 签退时出错: {error_msg}")
-                
-                # 记录失败结果
-                results[token_info.name] = CheckinResult(
-                    user_name=token_info.name,
-                    date=date.today().strftime("%Y-%m-%d"),
-                    time_period="未知",
-                    success=False,
-                    message="签退失败",
-                    error_reason=error_msg
-                )
-                
-        return results 
\ No newline at end of file
+    async def checkout(self) -> List[CheckinResult]:
+        """执行签退，所有用户并发处理"""
+        self.clear_tick_cache()
+        today = date.today().isoformat()
+        tokens = self.schedule_service.get_user_tokens()
+        return list(await asyncio.gather(
+            *(self._process_user(token_info, today, for_checkout=True) for token_info in tokens)
+        ))
@@ -1,10 +1,14 @@
 """
 定时预订服务
 """
-import json
+import asyncio
 import os
 from datetime import datetime
-from typing import List, Optional, Dict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import orjson
+from pydantic import TypeAdapter
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
 from loguru import logger
@@ -12,11 +16,25 @@ from loguru import logger
 from ..schemas.schedule_models import (
     ScheduleConfig,
     ScheduleStatus,
+    ScheduleResponse,
     UserToken
 )
 from ..core.seat_reservation import SeatReservation
 from ..utils.helpers import get_target_date
 
+# 一次性校验/序列化整个token列表
+_TOKENS_ADAPTER = TypeAdapter(List[UserToken])
+
+# token变更后延迟保存的时间（秒），连续变更只写一次文件
+SAVE_DEBOUNCE_SECONDS = 0.5
+
+
+@lru_cache(maxsize=32)
+def compile_cron(expr: str) -> CronTrigger:
+    """解析cron表达式为触发器，相同表达式只解析一次"""
+    return CronTrigger.from_crontab(expr)
+
+
 class ScheduleService:
     """定时预订服务"""
     
@@ -32,49 +50,99 @@ class ScheduleService:
         if not self._initialized:
             self.scheduler = AsyncIOScheduler()
             self.config = ScheduleConfig()
-            self.user_tokens: List[UserToken] = []
+            self._tokens_by_name: Dict[str, UserToken] = {}  # 用户名 -> token信息
+            self._last_serialized: Optional[bytes] = None  # 最近一次写入文件的内容
+            self._save_lock = asyncio.Lock()  # 串行化并发的文件写入
+            self._save_handle: Optional[asyncio.TimerHandle] = None  # 待执行的延迟保存
+            self._save_task: Optional[asyncio.Task] = None  # 正在执行的保存任务
             self.job = None
             self.last_run_time: Optional[datetime] = None
             self.last_run_result: Optional[str] = None
+            # token文件路径只解析一次，目录也只在初始化时创建
+            self._token_path = Path(__file__).resolve().parent.parent / "data" / "user_tokens.json"
+            self._token_path.parent.mkdir(parents=True, exist_ok=True)
             self._load_user_tokens()
             logger.info("定时任务服务初始化完成")
             self._initialized = True
         
-    def _get_token_file_path(self) -> str:
-        """获取token文件路径"""
-        return os.path.join(os.path.dirname(__file__), "..", "data", "user_tokens.json")
-        
     def _load_user_tokens(self) -> None:
         """从文件加载用户token信息"""
         try:
-            file_path = self._get_token_file_path()
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            
-            if os.path.exists(file_path):
-                with open(file_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    self.user_tokens = [UserToken(**token) for token in data]
-                    logger.info(f"成功加载 {len(self.user_tokens)} 个用户token")
+            if self._token_path.exists():
+                raw = self._token_path.read_bytes()
+                self._set_tokens(_TOKENS_ADAPTER.validate_python(orjson.loads(raw)))
+                self._last_serialized = raw
+                logger.info(f"成功加载 {len(self._tokens_by_name)} 个用户token")
             else:
                 logger.info("token文件不存在，将在首次保存时创建")
         except Exception as e:
             logger.error(f"加载token文件失败: {str(e)}")
             
-    def _save_user_tokens(self) -> None:
-        """保存用户token信息到文件"""
+    def _write_token_file(self, payload: bytes) -> None:
+        """将序列化后的token信息写入临时文件，再原子替换目标文件"""
+        tmp_path = self._token_path.with_suffix(".json.tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, self._token_path)
+            
+    def _serialize_tokens(self) -> bytes:
+        """序列化当前的用户token列表"""
+        return orjson.dumps(
+            _TOKENS_ADAPTER.dump_python(self.user_tokens, mode="json"),
+            option=orjson.OPT_INDENT_2
+        )
+            
+    def _save_user_tokens_sync(self) -> None:
+        """在没有事件循环时同步保存用户token信息，内容未变化时跳过写入"""
         try:
-            file_path = self._get_token_file_path()
-            with open(file_path, "w", encoding="utf-8") as f:
-                json.dump(
-                    [token.model_dump() for token in self.user_tokens],
-                    f,
-                    ensure_ascii=False,
-                    indent=2
-                )
-            logger.info(f"成功保存 {len(self.user_tokens)} 个用户token")
+            payload = self._serialize_tokens()
+            if payload == self._last_serialized:
+                logger.debug("用户token未变化，跳过保存")
+                return
+            self._write_token_file(payload)
+            self._last_serialized = payload
+            logger.info(f"成功保存 {len(self._tokens_by_name)} 个用户token")
+        except Exception as e:
+            logger.error(f"保存token文件失败: {str(e)}")
+            
+    async def _save_user_tokens(self) -> None:
+        """保存用户token信息到文件，内容未变化时跳过写入"""
+        try:
+            payload = self._serialize_tokens()
+            async with self._save_lock:
+                if payload == self._last_serialized:
+                    logger.debug("用户token未变化，跳过保存")
+                    return
+                # 文件写入放到线程中执行，避免阻塞事件循环
+                await asyncio.to_thread(self._write_token_file, payload)
+                self._last_serialized = payload
+            logger.info(f"成功保存 {len(self._tokens_by_name)} 个用户token")
         except Exception as e:
             logger.error(f"保存token文件失败: {str(e)}")
             
+    def _schedule_save(self) -> None:
+        """延迟保存token文件，期间的新变更会重新计时；不在事件循环中时立即同步保存"""
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._save_user_tokens_sync()
+            return
+        self._save_handle = loop.call_later(SAVE_DEBOUNCE_SECONDS, self._start_save)
+        
+    def _start_save(self) -> None:
+        """延迟时间到达后启动保存任务"""
+        self._save_handle = None
+        self._save_task = asyncio.ensure_future(self._save_user_tokens())
+        
+    async def flush_user_tokens(self) -> None:
+        """立即保存尚未写入文件的token变更"""
+        if self._save_handle is not None:
+            self._save_handle.cancel()
+            self._save_handle = None
+        await self._save_user_tokens()
+            
     async def _schedule_task(self) -> None:
         """定时任务执行函数"""
         try:
@@ -96,25 +164,18 @@ class ScheduleService:
             # 记录结果
             if results:
                 logger.info(f"预订成功，共 {len(results)} 个结果")
-                success_count = 0
-                result_messages = []
+                # 每条结果都带有用户名，状态格式为"成功 - 消息"或"失败 - 消息"
+                success_count = sum(1 for result in results if result["status"].startswith("成功"))
                 for result in results:
-                    status = result['status']
-                    if 'success' in status.lower():
-                        success_count += 1
-                    result_messages.append(
-                        f"{result['user_name']}: {status} ({result['area']} {result['seat']} {result['time_period']})"
-                    )
                     logger.info(
-                        f"预订结果: "
-                        f"用户={result['user_name']}, "
-                        f"时间段={result['time_period']},"
-                        f"状态={status}, "
-                        f"区域={result['area']}, "
-                        f"座位={result['seat']}"
-                        
+                        "预订结果: 用户={user_name}, 时间段={time_period}, 状态={status}, 区域={area}, 座位={seat}",
+                        **result
                     )
-                self.last_run_result = f"成功预订 {success_count}/{len(results)} 个座位。" + " ".join(result_messages)
+                result_messages = " ".join(
+                    f"{result['user_name']}: {result['status']} ({result['area']} {result['seat']} {result['time_period']})"
+                    for result in results
+                )
+                self.last_run_result = f"成功预订 {success_count}/{len(results)} 个座位。" + result_messages
             else:
                 logger.warning("预订失败，没有找到可用座位")
                 self.last_run_result = "预订失败：没有找到可用座位"
@@ -147,7 +208,7 @@ class ScheduleService:
             # 添加新任务
             self.job = self.scheduler.add_job(
                 self._schedule_task,
-                CronTrigger.from_crontab(self.config.cron),
+                compile_cron(self.config.cron),
                 id="seat_reservation"
             )
             logger.info(f"定时任务已配置，cron表达式: {self.config.cron}")
@@ -185,6 +246,14 @@ class ScheduleService:
             last_run_result=self.last_run_result
         )
         
+    def get_response(self) -> ScheduleResponse:
+        """获取包含配置、状态和用户token的完整响应"""
+        return ScheduleResponse(
+            config=self.config,
+            status=self.get_status(),
+            user_tokens=self.user_tokens
+        )
+        
     def update_config(self, config: ScheduleConfig) -> None:
         """更新定时任务配置"""
         self.config = config
@@ -193,27 +262,34 @@ class ScheduleService:
         else:
             self.stop()
             
+    @property
+    def user_tokens(self) -> List[UserToken]:
+        """按添加顺序排列的用户token列表"""
+        return list(self._tokens_by_name.values())
+        
+    def _set_tokens(self, tokens: Iterable[UserToken]) -> None:
+        """以用户名为键重建token索引，同名用户保留最后一个"""
+        self._tokens_by_name = {token.name: token for token in tokens}
+        
     def get_user_tokens(self) -> List[UserToken]:
         """获取所有用户token"""
         return self.user_tokens
         
     def update_user_tokens(self, tokens: List[UserToken]) -> None:
         """更新用户token列表"""
-        self.user_tokens = tokens
-        self._save_user_tokens()
+        self._set_tokens(tokens)
+        self._schedule_save()
         
     def add_user_token(self, token: UserToken) -> None:
-        """添加用户token"""
-        # 检查是否已存在
-        for existing in self.user_tokens:
-            if existing.name == token.name:
-                existing.token = token.token
-                break
+        """添加用户token，已存在同名用户时更新其token"""
+        existing = self._tokens_by_name.get(token.name)
+        if existing is not None:
+            existing.token = token.token
         else:
-            self.user_tokens.append(token)
-        self._save_user_tokens()
+            self._tokens_by_name[token.name] = token
+        self._schedule_save()
         
     def remove_user_token(self, name: str) -> None:
         """删除用户token"""
-        self.user_tokens = [t for t in self.user_tokens if t.name != name]
-        self._save_user_tokens() 
\ No newline at end of file
+        self._tokens_by_name.pop(name, None)
+        self._schedule_save() 
\ No newline at end of file
@@ -1,19 +1,67 @@
 """
 座位预订核心模块
 """
-from typing import Dict, List, Optional, Any, TypedDict, Set
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, List, Optional, Any, Tuple, TypedDict, Set
+import orjson
+import random
 import requests
 from loguru import logger
 import time
 
-from ..config.settings import settings
+from ..config.settings import settings, record_seat, get_booked_tables
+from ..http_client import get_session, REQUEST_TIMEOUT
 from ..utils.helpers import (
     get_target_date,
     is_odd_table,
     get_preferred_seats,
+    split_seat_row_column,
     update_request_headers
 )
 
+# 并发查询区域座位的最大线程数
+SEAT_FETCH_WORKERS = 8
+
+# 区域列表基本不变，缓存5分钟
+AREAS_CACHE_TTL = 300
+# (接口地址, 楼层ID) -> (获取时间, 区域列表)
+_AREAS_CACHE: Dict[Tuple[str, Any], Tuple[float, List[Dict[str, Any]]]] = {}
+
+# 重试等待的上限（秒）
+MAX_RETRY_DELAY = 30.0
+
+
+def _retry_delay(attempt: int, base: float, response: Optional[requests.Response] = None) -> float:
+    """
+    计算第 attempt 次失败后的等待时间：指数退避加随机抖动，
+    服务端返回 429 并带有 Retry-After 时优先使用该值
+    
+    Args:
+        attempt: 已失败的次数，从0开始
+        base: 基础间隔（秒）
+        response: 失败请求的响应
+        
+    Returns:
+        等待秒数
+    """
+    if response is not None and response.status_code == 429:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return min(MAX_RETRY_DELAY, float(retry_after))
+    return min(MAX_RETRY_DELAY, base * (2 ** attempt)) * (1 + random.uniform(0, 0.5))
+
+
+@lru_cache(maxsize=8)
+def area_priority_rank(area_priority: Tuple[str, ...]) -> Dict[str, int]:
+    """区域名称到优先级序号的映射，按优先级列表缓存"""
+    rank: Dict[str, int] = {}
+    for i, name in enumerate(area_priority):
+        # 与 list.index 一致，重复名称取第一次出现的位置
+        rank.setdefault(name, i)
+    return rank
+
 
 class SeatInfo(TypedDict):
     """座位信息类型"""
@@ -50,56 +98,128 @@ class ReservationResult(TypedDict):
     user_name: str
 
 
+def _group_seats_by_table(
+    seats: Iterable[SeatInfo],
+    only_odd: bool,
+    table_key: Callable[[SeatInfo], str]
+) -> Dict[str, List[SeatInfo]]:
+    """
+    按桌分组座位，only_odd 为真时只保留奇数桌
+    
+    Args:
+        seats: 待分组的座位
+        only_odd: 是否只保留奇数桌号
+        table_key: 从座位中取出分组键的函数
+        
+    Returns:
+        {分组键: [座位]}
+    """
+    tables: Dict[str, List[SeatInfo]] = {}
+    for seat in seats:
+        if only_odd and not is_odd_table(str(seat["seatRow"])):
+            continue
+        tables.setdefault(table_key(seat), []).append(seat)
+    return tables
+
+
+def _rank_table_seats(table_seats: List[SeatInfo], count: int) -> List[SeatInfo]:
+    """
+    按右侧优先的顺序排列同一桌的座位，返回前 count 个
+    
+    Args:
+        table_seats: 同一桌的座位
+        count: 需要的座位数量
+        
+    Returns:
+        优先级最高的 count 个座位
+    """
+    # 每个座位号只解析一次
+    parsed = [(int(seat["seatNo"].rstrip("号")), seat) for seat in table_seats]
+    preferred_order = get_preferred_seats(max(no for no, _ in parsed))
+    rank = {no: i for i, no in enumerate(preferred_order)}
+    miss = len(preferred_order)
+    parsed.sort(key=lambda item: rank.get(item[0], miss))
+    return [seat for _, seat in parsed[:count]]
+
+
 class SeatReservation:
     """座位预订类"""
     
-    def __init__(self, config: Dict[str, Any]):
+    # 接口路径
+    AREA_PATH = "/eastLibReservation/area"
+    PERIOD_PATH = "/eastLibReservation/api/period"
+    SEATS_PATH = "/eastLibReservation/seat/getAreaSeats"
+    RESERVE_PATH = "/eastLibReservation/seatReservation/reservation"
+    
+    def __init__(self, config: Dict[str, Any], session: Optional[requests.Session] = None):
         """
         初始化座位预订实例
         
         Args:
             config: 预订配置，包含 token
+            session: HTTP 会话，默认使用进程内共享的会话
         """
         self.config = config
+        self.session = session or get_session()
         self.base_url: str = settings.api_base_url
+        # 完整接口地址只在初始化时拼接一次
+        self._area_url = self.base_url + self.AREA_PATH
+        self._period_url = self.base_url + self.PERIOD_PATH
+        self._seats_url = self.base_url + self.SEATS_PATH
+        self._reserve_url = self.base_url + self.RESERVE_PATH
         self.headers = self._get_headers()
+        # token -> 完整请求头，同一 token 只生成一次
+        self._cached_headers: Dict[Optional[str], Dict[str, str]] = {}
         
     def _get_headers(self):
         """获取请求头"""
         return {"token": self.config["token"]}
+        
+    def _request_headers(self, token: Optional[str] = None) -> Dict[str, str]:
+        """获取发送请求用的完整请求头，未指定 token 时使用实例的 token"""
+        if token is None:
+            token = self.headers.get("token")
+        headers = self._cached_headers.get(token)
+        if headers is None:
+            headers = update_request_headers({"token": token} if token is not None else {})
+            self._cached_headers[token] = headers
+        return headers
 
-    def get_areas(self) -> List[Dict[str, Any]]:
-        """获取所有区域信息"""
-        url = f"{self.base_url}/eastLibReservation/area"
-        params = {"floorId": settings.floor_id}
-        headers = update_request_headers(self.headers)
-        response = requests.get(url, headers=headers, params=params)
-        logger.info(f"获取区域响应: {response.text}")
-        data = response.json()
-        areas = data.get("resultValue", [])
-        
-        # 按照优先级排序区域
-        def get_area_priority(area: Dict[str, Any]) -> int:
-            try:
-                # 去掉区域名称中的"区"字后再匹配优先级
-                area_name = area["areaName"].replace("区", "")
-                return settings.area_priority.index(area_name)
-            except ValueError:
-                return len(settings.area_priority)
+    def get_areas(self, token: Optional[str] = None) -> List[Dict[str, Any]]:
+        """获取所有区域信息，区域列表在有效期内复用缓存；token 为空时使用实例的 token"""
+        cache_key = (self.base_url, settings.floor_id)
+        cached = _AREAS_CACHE.get(cache_key)
+        if cached is not None and time.monotonic() - cached[0] < AREAS_CACHE_TTL:
+            areas = cached[1]
+        else:
+            url = self._area_url
+            params = {"floorId": settings.floor_id}
+            headers = self._request_headers(token)
+            response = self.session.get(url, headers=headers, params=params, timeout=REQUEST_TIMEOUT)
+            logger.opt(lazy=True).debug("获取区域响应: {}", lambda: response.text)
+            data = orjson.loads(response.content)
+            areas = data.get("resultValue", [])
+            if areas:
+                _AREAS_CACHE[cache_key] = (time.monotonic(), areas)
         
-        return sorted(areas, key=get_area_priority)
+        # 按照优先级排序区域，去掉区域名称中的"区"字后再匹配优先级
+        priority = tuple(settings.area_priority)
+        rank = area_priority_rank(priority)
+        default = len(priority)
+        return sorted(areas, key=lambda area: rank.get(area["areaName"].replace("区", ""), default))
 
-    def get_available_periods(self, date: str) -> List[PeriodInfo]:
+    def get_available_periods(self, date: str, token: Optional[str] = None) -> List[PeriodInfo]:
         """
         获取指定日期的可用时间段
         
         Args:
             date: 日期字符串，格式为 YYYY-MM-DD
+            token: 用户token，默认使用实例的 token
             
         Returns:
             可用时间段列表，每个时间段包含开始时间、结束时间和剩余座位数
         """
-        url = f"{self.base_url}/eastLibReservation/api/period"
+        url = self._period_url
         params = {
             "date": date,
             "reservationType": settings.period_reservation_type,
@@ -107,34 +227,34 @@ class SeatReservation:
         }
         
         # 更新请求头
-        headers = update_request_headers(self.headers)
+        headers = self._request_headers(token)
         
-        logger.info(f"请求时间段信息: URL={url}, Headers={headers}, Params={params}")
+        logger.debug("请求时间段信息: URL={}, Headers={}, Params={}", url, headers, params)
         
         try:
-            response = requests.get(url, headers=headers, params=params)
-            logger.info(f"状态码: {response.status_code}")
-            logger.info(f"响应头: {response.headers}")
-            logger.info(f"响应内容: {response.text}")
+            response = self.session.get(url, headers=headers, params=params, timeout=REQUEST_TIMEOUT)
+            logger.info("状态码: {}", response.status_code)
+            logger.opt(lazy=True).debug("响应头: {}", lambda: response.headers)
+            logger.opt(lazy=True).debug("响应内容: {}", lambda: response.text)
             
             if response.status_code != 200:
                 logger.error(f"请求失败: {response.status_code} - {response.text}")
                 return []
                 
-            data = response.json()
+            data = orjson.loads(response.content)
             periods = data.get("resultValue", [])
             if not periods:
                 logger.warning(f"没有找到任何时间段")
                 return []
                 
-            available_periods = [p for p in periods if p.get("quotaVo", {}).get("remaining", 0) > 0]
-            logger.info(f"找到 {len(periods)} 个时间段，其中可用的有 {len(available_periods)} 个")
-            
-            return [{
-                "startTime": p["beginTime"],
-                "endTime": p["endTime"],
-                "remaining": p["quotaVo"]["remaining"]
-            } for p in available_periods]
+            # 一次遍历完成过滤和字段转换，剩余量只读取一次
+            available_periods: List[PeriodInfo] = [
+                {"startTime": p["beginTime"], "endTime": p["endTime"], "remaining": remaining}
+                for p in periods
+                if (remaining := p.get("quotaVo", {}).get("remaining", 0)) > 0
+            ]
+            logger.info("找到 {} 个时间段，其中可用的有 {} 个", len(periods), len(available_periods))
+            return available_periods
         except requests.exceptions.RequestException as e:
             logger.error(f"请求异常: {str(e)}")
             return []
@@ -147,7 +267,10 @@ class SeatReservation:
         area_id: str,
         start_time: str,
         end_time: str,
-        area_name: str
+        area_name: str,
+        date: Optional[str] = None,
+        token: Optional[str] = None,
+        period_bounds: Optional[Tuple[str, str]] = None
     ) -> List[SeatInfo]:
         """
         获取指定区域的座位信息
@@ -157,46 +280,52 @@ class SeatReservation:
             start_time: 开始时间
             end_time: 结束时间
             area_name: 区域名称
+            date: 日期，格式为 YYYY-MM-DD，默认为目标预订日期
+            token: 用户token，默认使用实例的 token
+            period_bounds: 预先拼接好的 ("日期 开始时间", "日期 结束时间")，提供时直接使用
             
         Returns:
-            座位信息列表，每个座位包含 ID、状态、行列号等信息
+            可用座位信息列表，每个座位包含 ID、状态、行列号等信息
         """
-        url = f"{self.base_url}/eastLibReservation/seat/getAreaSeats"
-        target_date = get_target_date()
+        url = self._seats_url
+        if period_bounds is None:
+            target_date = date or get_target_date()
+            period_bounds = (f"{target_date} {start_time}", f"{target_date} {end_time}")
         params = {
             "areaId": area_id,
-            "reservationStartDate": f"{target_date} {start_time}",
-            "reservationEndDate": f"{target_date} {end_time}"
+            "reservationStartDate": period_bounds[0],
+            "reservationEndDate": period_bounds[1]
         }
         
         # 更新请求头
-        headers = update_request_headers(self.headers)
+        headers = self._request_headers(token)
         
-        logger.info(f"请求区域 {area_name} 的座位信息: URL={url}, Headers={headers}, Params={params}")
+        logger.debug("请求区域 {} 的座位信息: URL={}, Headers={}, Params={}", area_name, url, headers, params)
         
         try:
-            response = requests.get(url, headers=headers, params=params)
-            logger.info(f"状态码: {response.status_code}")
-            logger.info(f"响应头: {response.headers}")
-            # logger.info(f"响应内容: {response.text}")
+            response = self.session.get(url, headers=headers, params=params, timeout=REQUEST_TIMEOUT)
+            logger.info("状态码: {}", response.status_code)
+            logger.opt(lazy=True).debug("响应头: {}", lambda: response.headers)
             
             if response.status_code != 200:
                 logger.error(f"请求失败: {response.status_code} - {response.text}")
                 return []
                 
-            data = response.json()
+            data = orjson.loads(response.content)
             seats = data.get("resultValue", [])
             if not seats:
                 logger.warning(f"区域 {area_name} 没有找到任何座位")
                 return []
                 
-            # 处理每个座位信息，添加 seatRowColumn 字段
+            # 一次遍历：只保留可用座位（状态3），并为其添加 seatRowColumn 字段
+            available_seats: List[SeatInfo] = []
             for seat in seats:
-                seat["seatRowColumn"] = f"{seat['seatRow']} {seat['seatNo']}"
+                if seat.get("seatStatus") == 3:
+                    seat["seatRowColumn"] = f"{seat['seatRow']} {seat['seatNo']}"
+                    available_seats.append(seat)
                 
-            available_seats = [s for s in seats if s.get("seatStatus") == 3]
-            logger.info(f"区域 {area_name} 找到 {len(seats)} 个座位，其中可用的有 {len(available_seats)} 个")
-            return seats
+            logger.info("区域 {} 找到 {} 个座位，其中可用的有 {} 个", area_name, len(seats), len(available_seats))
+            return available_seats
         except requests.exceptions.RequestException as e:
             logger.error(f"请求异常: {str(e)}")
             return []
@@ -215,7 +344,9 @@ class SeatReservation:
         period: str,
         area_name: str,
         max_retries: int = 3,
-        retry_interval: float = 1.0
+        retry_interval: float = 1.0,
+        token: Optional[str] = None,
+        period_bounds: Optional[Tuple[str, str]] = None
     ) -> Dict[str, Any]:
         """
         预订座位，包含重试机制
@@ -230,17 +361,21 @@ class SeatReservation:
             period: 时间段
             area_name: 区域名称
             max_retries: 最大重试次数
-            retry_interval: 重试间隔（秒）
+            retry_interval: 首次重试的基础间隔（秒），之后按指数退避
+            token: 用户token，默认使用实例的 token
+            period_bounds: 预先拼接好的 ("日期 开始时间", "日期 结束时间")，提供时直接使用
             
         Returns:
             预订结果字典
         """
-        url = f"{self.base_url}/eastLibReservation/seatReservation/reservation"
+        url = self._reserve_url
+        if period_bounds is None:
+            period_bounds = (f"{date} {start_time}", f"{date} {end_time}")
         data = {
             "areaId": area_id,
             "floorId": settings.floor_id,
-            "reservationStartDate": f"{date} {start_time}",
-            "reservationEndDate": f"{date} {end_time}",
+            "reservationStartDate": period_bounds[0],
+            "reservationEndDate": period_bounds[1],
             "seatId": seat_id,
             "seatReservationType": settings.seat_reservation_type,
             "seatRowColumn": seat_row_column
@@ -249,37 +384,35 @@ class SeatReservation:
         for attempt in range(max_retries):
             try:
                 # 更新请求头
-                headers = update_request_headers(self.headers, force_update=False)
+                headers = self._request_headers(token)
                 
-                logger.info(f"尝试第 {attempt + 1} 次预订: URL={url}, Headers={headers}, Data={data}")
+                logger.debug("尝试第 {} 次预订: URL={}, Headers={}, Data={}", attempt + 1, url, headers, data)
                 
-                response = requests.post(url, headers=headers, json=data)
-                logger.info(f"状态码: {response.status_code}")
-                logger.info(f"响应头: {response.headers}")
-                logger.info(f"响应内容: {response.text}")
+                response = self.session.post(url, headers=headers, data=orjson.dumps(data), timeout=REQUEST_TIMEOUT)
+                logger.info("状态码: {}", response.status_code)
+                logger.opt(lazy=True).debug("响应头: {}", lambda: response.headers)
+                logger.opt(lazy=True).debug("响应内容: {}", lambda: response.text)
                 
                 if response.status_code != 200:
                     logger.error(f"请求失败: {response.status_code} - {response.text}")
                     if attempt < max_retries - 1:
-                        time.sleep(retry_interval)
+                        time.sleep(_retry_delay(attempt, retry_interval, response))
                         continue
                     return {"status": "error", "message": f"请求失败: {response.status_code}"}
                     
-                result = response.json()
+                result = orjson.loads(response.content)
                 
                 # 如果预订成功，更新共享座位记录
                 if result.get("resultStatus", {}).get("code") == 0:
-                    seat_no = int(seat_row_column.split("号")[0].split()[-1])
-                    table_number = seat_row_column.split("排")[0]
-                    if table_number not in settings.shared_seat_records[date][period][area_name]:
-                        settings.shared_seat_records[date][period][area_name][table_number] = []
-                    settings.shared_seat_records[date][period][area_name][table_number].append(str(seat_no))
+                    table_number, seat_no = split_seat_row_column(seat_row_column)
+                    record_seat(date, period, area_name, table_number, seat_no)
                     return {"status": "success", "message": "预订成功"}
                 else:
                     error_msg = result.get("resultStatus", {}).get("message", "未知错误")
                     if "已被预订" in error_msg and attempt < max_retries - 1:
-                        logger.warning(f"座位已被预订，等待 {retry_interval} 秒后重试...")
-                        time.sleep(retry_interval)
+                        delay = _retry_delay(attempt, retry_interval)
+                        logger.warning("座位已被预订，等待 {:.2f} 秒后重试...", delay)
+                        time.sleep(delay)
                         continue
                     return {"status": "error", "message": error_msg}
                     
@@ -319,26 +452,18 @@ class SeatReservation:
         if not seats:
             return None
 
-        # 按桌号分组座位
-        tables: Dict[str, List[SeatInfo]] = {}
-        for seat in seats:
-            if seat["seatStatus"] != 3:  # 不是可用座位
-                continue
-            
-            row = seat["seatRow"]
-            if row not in tables:
-                tables[row] = []
-            tables[row].append(seat)
-
-        # 如果是南区，只考虑奇数桌号
-        if area_name == "南":
-            tables = {row: seats for row, seats in tables.items() if is_odd_table(row)}
+        # 按桌号分组可用座位（状态3），南区只考虑奇数桌号
+        tables = _group_seats_by_table(
+            (seat for seat in seats if seat["seatStatus"] == 3),
+            only_odd=area_name == "南",
+            table_key=itemgetter("seatRow")
+        )
 
         if not tables:
             return None
 
         # 获取当前时间段已预订的桌子
-        booked_tables = settings.shared_seat_records[date][period][area_name]
+        booked_tables = get_booked_tables(date, period, area_name)
         
         # 对桌子进行排序，优先选择已有预订的桌子
         sorted_tables: List[tuple[int, str]] = []
@@ -349,24 +474,10 @@ class SeatReservation:
         
         sorted_tables.sort()
 
-        # 对每个桌子的座位进行排序
+        # 返回优先级最高的桌子中最靠右的座位
         for _, row in sorted_tables:
-            if not tables[row]:
-                continue
-                
-            seats = tables[row]
-            max_seat_no = max(int(seat["seatNo"].replace("号", "")) for seat in seats)
-            preferred_order = get_preferred_seats(max_seat_no)
-            
-            # 按照优先级排序座位
-            seats.sort(
-                key=lambda x: preferred_order.index(int(x["seatNo"].replace("号", "")))
-                if int(x["seatNo"].replace("号", "")) in preferred_order
-                else len(preferred_order)
-            )
-            
-            # 返回第一个可用座位
-            return seats[0] if seats else None
+            if tables[row]:
+                return _rank_table_seats(tables[row], 1)[0]
             
         return None
 
@@ -394,45 +505,18 @@ class SeatReservation:
         if not seats_per_period:
             return []
             
-        # 找到在所有时间段都可用的座位
-        seats_first: List[SeatInfo] = seats_per_period[0]
-        common_seats: List[SeatInfo] = []
+        # 找到在所有时间段都可用的座位：对各时间段的可用座位ID求交集
+        common_ids = set.intersection(*(
+            {seat["seatId"] for seat in period_seats if seat["seatStatus"] == 3}
+            for period_seats in seats_per_period
+        ))
         
-        for seat in seats_first:
-            if seat["seatStatus"] != 3:
-                continue
-            is_available_all_periods = True
-            for other_period_seats in seats_per_period[1:]:
-                found_seat = next(
-                    (s for s in other_period_seats if s["seatId"] == seat["seatId"]), 
-                    None
-                )
-                if not found_seat or found_seat["seatStatus"] != 3:
-                    is_available_all_periods = False
-                    break
-            if is_available_all_periods:
-                common_seats.append(seat)
-        
-        if not common_seats:
-            return []
-            
-        # 如果是南区，只保留奇数桌
-        if area_name == "南":
-            common_seats = [
-                seat for seat in common_seats 
-                if is_odd_table(str(seat["seatRow"]))
-            ]
-            
-        if not common_seats:
-            return []
-            
-        # 按桌号分组座位
-        tables: Dict[str, List[SeatInfo]] = {}
-        for seat in common_seats:
-            table_number = seat["seatRowColumn"].split("排")[0]
-            if table_number not in tables:
-                tables[table_number] = []
-            tables[table_number].append(seat)
+        # 按桌号分组共同座位，南区只保留奇数桌
+        tables = _group_seats_by_table(
+            (seat for seat in seats_per_period[0] if seat["seatId"] in common_ids),
+            only_odd=area_name == "南",
+            table_key=lambda seat: seat["seatRowColumn"].split("排", 1)[0]
+        )
         
         # 筛选出有足够座位的桌子
         valid_tables = {
@@ -450,88 +534,122 @@ class SeatReservation:
             if len(result_seats) == required_seats:
                 break
                 
-            max_seat_no = max(
-                int(seat["seatNo"].replace("号", "")) 
-                for seat in table_seats
-            )
-            preferred_order = get_preferred_seats(max_seat_no)
-            
-            # 按照优先级排序座位
-            table_seats.sort(
-                key=lambda seat: preferred_order.index(
-                    int(seat["seatNo"].replace("号", ""))
-                ) if int(seat["seatNo"].replace("号", "")) in preferred_order 
-                else len(preferred_order)
-            )
-            
             # 添加所需数量的座位
             seats_needed = required_seats - len(result_seats)
-            result_seats.extend(table_seats[:seats_needed])
+            result_seats.extend(_rank_table_seats(table_seats, seats_needed))
             
         return result_seats
 
-    def make_reservation(self, users_config: List[Dict[str, Any]]) -> List[ReservationResult]:
+    def make_reservation(
+        self,
+        users_config: List[Dict[str, Any]],
+        target_date: Optional[str] = None
+    ) -> List[ReservationResult]:
         """
         为多个用户同时预订座位
         
         Args:
             users_config: 用户配置列表，每个用户包含 token 信息
+            target_date: 预订日期，格式为 YYYY-MM-DD，默认根据提前天数计算
             
         Returns:
             预订结果列表
         """
         results: List[ReservationResult] = []
-        target_date = get_target_date()
+        target_date = target_date or get_target_date()
         logger.info(f"目标日期: {target_date}")
         
-        # 初始化共享座位记录
-        if target_date not in settings.shared_seat_records:
-            settings.shared_seat_records[target_date] = {}
-            
         # 获取可用时间段
         periods_data = self.get_available_periods(target_date)
         if not periods_data:
             logger.warning("没有找到可用时间段")
             return results
             
-        # 初始化时间段记录
-        period_strs: List[str] = []
-        for period in periods_data:
-            p_str: str = f"{period['startTime']}-{period['endTime']}"
-            period_strs.append(p_str)
-            if p_str not in settings.shared_seat_records[target_date]:
-                settings.shared_seat_records[target_date][p_str] = {}
-                
+        period_strs: List[str] = [
+            f"{period['startTime']}-{period['endTime']}" for period in periods_data
+        ]
+        # 每个时间段的完整起止时间只拼接一次，查询和预订时复用
+        period_bounds: List[Tuple[str, str]] = [
+            (f"{target_date} {period['startTime']}", f"{target_date} {period['endTime']}")
+            for period in periods_data
+        ]
+        
         # 获取并按优先级排序区域
         areas = self.get_areas()
         if not areas:
             logger.warning("没有找到可用区域")
             return results
             
+        # 并发获取所有区域各时间段的座位信息，按区域优先级依次使用
+        executor = ThreadPoolExecutor(max_workers=min(SEAT_FETCH_WORKERS, len(areas) * len(periods_data)))
+        area_futures: List[Tuple[Dict[str, Any], List["Future[List[SeatInfo]]"]]] = [
+            (area, [
+                executor.submit(
+                    self.get_area_seats,
+                    str(area["id"]), period["startTime"], period["endTime"], area["areaName"], target_date,
+                    period_bounds=bounds
+                )
+                for period, bounds in zip(periods_data, period_bounds)
+            ])
+            for area in areas
+        ]
+        try:
+            self._reserve_in_areas(
+                area_futures, users_config, periods_data, period_strs, period_bounds, target_date, results
+            )
+        finally:
+            # 已找到座位或全部失败后，取消尚未开始的查询
+            executor.shutdown(wait=False, cancel_futures=True)
+                
+        return results
+
+    def _reserve_in_areas(
+        self,
+        area_futures: List[Tuple[Dict[str, Any], List["Future[List[SeatInfo]]"]]],
+        users_config: List[Any],
+        periods_data: List[PeriodInfo],
+        period_strs: List[str],
+        period_bounds: List[Tuple[str, str]],
+        target_date: str,
+        results: List[ReservationResult]
+    ) -> None:
+        """
+        按区域优先级尝试预订，结果追加到 results
+        
+        Args:
+            area_futures: (区域, 各时间段座位查询) 列表，已按优先级排序
+            users_config: 用户配置列表
+            periods_data: 可用时间段
+            period_strs: 时间段字符串列表
+            period_bounds: 各时间段的完整起止时间
+            target_date: 目标日期
+            results: 预订结果列表
+        """
         # 遍历每个区域
-        for area in areas:
+        for area, futures in area_futures:
             area_name = area["areaName"]
             area_id = str(area["id"])
             
-            # 初始化区域记录
-            for p_str in period_strs:
-                if area_name not in settings.shared_seat_records[target_date][p_str]:
-                    settings.shared_seat_records[target_date][p_str][area_name] = {}
-                    
-            # 获取每个时间段的座位信息
+            # 获取每个时间段的座位信息，共同可用的座位不够时提前放弃该区域
+            required_seats = len(users_config)
             seats_per_period: List[List[SeatInfo]] = []
+            common_ids: Optional[Set[int]] = None
             all_periods_available = True
             
-            for period in periods_data:
-                start_time = period["startTime"]
-                end_time = period["endTime"]
-                seats = self.get_area_seats(area_id, start_time, end_time, area_name)
-                if not seats:
+            for i, future in enumerate(futures):
+                seats = future.result()
+                period_ids = {seat["seatId"] for seat in seats if seat["seatStatus"] == 3}
+                common_ids = period_ids if common_ids is None else common_ids & period_ids
+                if len(common_ids) < required_seats:
                     all_periods_available = False
+                    # 取消该区域尚未开始的其余时间段查询
+                    for pending in futures[i + 1:]:
+                        pending.cancel()
                     break
                 seats_per_period.append(seats)
                 
             if not all_periods_available:
+                logger.debug("区域 {} 没有足够的共同可用座位，跳过", area_name)
                 continue
                 
             # 查找满足所有用户的座位组合
@@ -540,7 +658,7 @@ class SeatReservation:
                 area_name=area_name,
                 date=target_date,
                 periods=period_strs,
-                required_seats=len(users_config)
+                required_seats=required_seats
             )
             
             if not best_seats:
@@ -549,61 +667,95 @@ class SeatReservation:
                 
             logger.info(f"区域 {area_name} 找到共同座位: {[seat['seatRowColumn'] for seat in best_seats]}")
             
-            # 为每个用户预订座位
-            reservation_failed = False  # 标记是否有预订失败（非已预约的情况）
-            for user_idx, (user_config, seat) in enumerate(zip(users_config, best_seats)):
-                # 更新当前实例的 headers
-                self.headers = {"token": user_config.token}
-                
-                for i, period in enumerate(periods_data):
-                    # 如果不是第一次预订，则等待指定的时间间隔
-                    if i > 0 or user_idx > 0:
-                        interval = settings.reservation_interval / 1000
-                        logger.info(f"等待 {interval} 秒后进行下一次预订...")
-                        time.sleep(interval)
-                        
-                    start_time = period["startTime"]
-                    end_time = period["endTime"]
-                    p_str = f"{start_time}-{end_time}"
-                    
-                    result = self.reserve_seat(
-                        area_id=area_id,
-                        seat_id=seat["seatId"],
-                        seat_row_column=seat["seatRowColumn"],
-                        start_time=start_time,
-                        end_time=end_time,
-                        date=target_date,
-                        period=p_str,
-                        area_name=area_name
+            # 不同用户预订的是不同座位，并发为每个用户预订
+            with ThreadPoolExecutor(max_workers=len(best_seats)) as user_executor:
+                user_futures = [
+                    user_executor.submit(
+                        self._reserve_user_all_periods,
+                        user_config, seat, area_id, area_name, periods_data, period_strs, period_bounds, target_date
                     )
-                    
-                    status = "成功" if result.get("status") == "success" else "失败"
-                    message = result.get("message", "")
-                    
-                    # 使用接口传入的用户名记录日志
-                    logger.info(
-                        f"用户 {user_config.name} 在区域 {area_name} "
-                        f"时间段 {p_str} 预订结果: {status} - {message}"
-                    )
-                    
-                    results.append({
-                        "user_name": user_config.name,
-                        "time_period": p_str,
-                        "area": area_name,
-                        "seat": seat["seatRowColumn"],
-                        "status": f"{status} - {message}"
-                    })
-                    
-                    # 如果预订失败，且不是因为已有预约，则需要切换区域重试
-                    if result.get("status") != "success" and "在该时间段有其他预约" not in message:
-                        reservation_failed = True
-                        break
-                
-                if reservation_failed:
-                    break
+                    for user_config, seat in zip(users_config, best_seats)
+                ]
+                user_outcomes = [future.result() for future in user_futures]
+            
+            # 按用户顺序汇总结果，标记是否有预订失败（非已预约的情况）
+            reservation_failed = False
+            for user_results, user_failed in user_outcomes:
+                results.extend(user_results)
+                reservation_failed = reservation_failed or user_failed
                     
             # 只有在发生预订失败（非已预约）的情况下才切换区域
             if not reservation_failed:
                 break
+
+    def _reserve_user_all_periods(
+        self,
+        user_config: Any,
+        seat: SeatInfo,
+        area_id: str,
+        area_name: str,
+        periods_data: List[PeriodInfo],
+        period_strs: List[str],
+        period_bounds: List[Tuple[str, str]],
+        target_date: str
+    ) -> Tuple[List[ReservationResult], bool]:
+        """
+        为单个用户依次预订所有时间段的同一座位
+        
+        Args:
+            user_config: 用户配置
+            seat: 要预订的座位
+            area_id: 区域ID
+            area_name: 区域名称
+            periods_data: 可用时间段
+            period_strs: 时间段字符串列表
+            period_bounds: 各时间段的完整起止时间
+            target_date: 目标日期
+            
+        Returns:
+            (预订结果列表, 是否发生非已预约原因的失败)
+        """
+        user_results: List[ReservationResult] = []
+        
+        for i, (period, p_str, bounds) in enumerate(zip(periods_data, period_strs, period_bounds)):
+            # 同一用户的相邻两次预订之间等待指定的时间间隔
+            if i > 0:
+                interval = settings.reservation_interval / 1000
+                logger.info(f"等待 {interval} 秒后进行下一次预订...")
+                time.sleep(interval)
+                
+            result = self.reserve_seat(
+                area_id=area_id,
+                seat_id=seat["seatId"],
+                seat_row_column=seat["seatRowColumn"],
+                start_time=period["startTime"],
+                end_time=period["endTime"],
+                date=target_date,
+                period=p_str,
+                area_name=area_name,
+                token=user_config.token,
+                period_bounds=bounds
+            )
+            
+            status = "成功" if result.get("status") == "success" else "失败"
+            message = result.get("message", "")
+            
+            # 使用接口传入的用户名记录日志
+            logger.info(
+                f"用户 {user_config.name} 在区域 {area_name} "
+                f"时间段 {p_str} 预订结果: {status} - {message}"
+            )
+            
+            user_results.append({
+                "user_name": user_config.name,
+                "time_period": p_str,
+                "area": area_name,
+                "seat": seat["seatRowColumn"],
+                "status": f"{status} - {message}"
+            })
+            
+            # 如果预订失败，且不是因为已有预约，则需要切换区域重试
+            if result.get("status") != "success" and "在该时间段有其他预约" not in message:
+                return user_results, True
                 
-        return results 
\ No newline at end of file
+        return user_results, False
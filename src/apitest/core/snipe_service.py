@@ -4,7 +4,7 @@
 from datetime import datetime, date, timedelta
 import time
 import uuid
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import asyncio
 from loguru import logger
 
@@ -28,8 +28,10 @@ class SnipeService:
         """初始化捡漏服务"""
         if not self._initialized:
             self._tasks: Dict[str, SnipeTask] = {}
+            self._active_by_key: Dict[Tuple[str, date], SnipeTask] = {}  # (token, 日期) -> 活动任务
             self._running = False
             self._lock = asyncio.Lock()
+            self._wake = asyncio.Event()  # 任务变化时提前唤醒捡漏循环
             self._initialized = True
             logger.info("捡漏服务初始化完成")
     
@@ -48,11 +50,11 @@ class SnipeService:
         today = date.today()
         yesterday = today - timedelta(days=1)
         
-        logger.debug(
-            f"日期调试信息: "
-            f"目标日期={target_date} ({type(target_date)}), "
-            f"今天={today} ({type(today)}), "
-            f"昨天={yesterday} ({type(yesterday)})"
+        logger.opt(lazy=True).debug(
+            "日期调试信息: 目标日期={} ({}), 今天={} ({}), 昨天={} ({})",
+            lambda: target_date, lambda: type(target_date),
+            lambda: today, lambda: type(today),
+            lambda: yesterday, lambda: type(yesterday)
         )
         
         # 验证目标日期 - 只有昨天及以前的日期才算过期
@@ -76,15 +78,17 @@ class SnipeService:
         )
         
         # 检查是否已存在相同的任务
-        for task in self._tasks.values():
-            if (task.user_token == user_token and 
-                task.target_date == target_date and 
-                task.status == TaskStatus.ACTIVE):
+        key = (user_token, target_date)
+        existing = self._active_by_key.get(key)
+        if existing is not None:
+            if existing.status == TaskStatus.ACTIVE:
                 logger.info(f"任务已存在: 用户={user_name}, 日期={target_date}")
-                return task
+                return existing
+            # 任务已完成或过期，移除索引
+            del self._active_by_key[key]
         
         task = SnipeTask(
-            id=str(uuid.uuid4()),
+            id=uuid.uuid4().hex,
             user_token=user_token,
             user_name=user_name,
             target_date=target_date,
@@ -93,10 +97,13 @@ class SnipeService:
         
         async with self._lock:
             self._tasks[task.id] = task
+            self._active_by_key[key] = task
             if not self._running:
                 self._running = True
                 asyncio.create_task(self._snipe_loop())
                 logger.info("启动捡漏循环")
+            else:
+                self._wake.set()
         
         logger.info(
             f"创建捡漏任务: ID={task.id}, "
@@ -106,6 +113,13 @@ class SnipeService:
         )
         return task
     
+    def shutdown(self) -> None:
+        """停止捡漏循环"""
+        if self._running:
+            self._running = False
+            self._wake.set()
+            logger.info("捡漏循环已停止")
+    
     def get_active_tasks(self) -> List[SnipeTask]:
         """获取所有活动中的任务"""
         active_tasks = [task for task in self._tasks.values() 
@@ -123,15 +137,36 @@ class SnipeService:
         Returns:
             已停止的任务列表
         """
-        stopped_tasks = []
         async with self._lock:
-            for task_id in task_ids:
-                if task := self._tasks.get(task_id):
-                    task.status = TaskStatus.TERMINATED
-                    stopped_tasks.append(task)
-                    logger.info(f"停止任务: ID={task_id}, 用户={task.user_name}")
+            # 同一任务ID只处理一次
+            stopped = (self._stop_one(task_id) for task_id in dict.fromkeys(task_ids))
+            stopped_tasks = [task for task in stopped if task is not None]
+        if stopped_tasks:
+            # 让捡漏循环立即重新检查活动任务
+            self._wake.set()
         return stopped_tasks
     
+    def _stop_one(self, task_id: str) -> Optional[SnipeTask]:
+        """
+        停止单个任务，调用方需持有锁
+        
+        Args:
+            task_id: 任务ID
+            
+        Returns:
+            已停止的任务，任务不存在时返回 None
+        """
+        task = self._tasks.get(task_id)
+        if task is None:
+            return None
+        
+        task.status = TaskStatus.TERMINATED
+        key = (task.user_token, task.target_date)
+        if self._active_by_key.get(key) is task:
+            del self._active_by_key[key]
+        logger.info(f"停止任务: ID={task_id}, 用户={task.user_name}")
+        return task
+    
     async def _snipe_loop(self):
         """捡漏主循环"""
         logger.info("捡漏循环开始运行")
@@ -162,12 +197,20 @@ class SnipeService:
                     await self._snipe_for_date(target_date, tasks)
                 
                 # 等待下一次执行
-                logger.debug(f"等待 {settings.snipe_interval} 秒后进行下一轮捡漏")
-                await asyncio.sleep(settings.snipe_interval)
+                logger.debug("等待 {} 秒后进行下一轮捡漏", settings.snipe_interval)
+                await self._wait_next_round()
             
             except Exception as e:
                 logger.error(f"捡漏任务执行出错: {str(e)}")
-                await asyncio.sleep(settings.snipe_interval)
+                await self._wait_next_round()
+    
+    async def _wait_next_round(self) -> None:
+        """等待下一轮捡漏，等待期间任务被创建或停止时提前唤醒"""
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=settings.snipe_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._wake.clear()
     
     async def _snipe_for_date(self, target_date: date, tasks: List[SnipeTask]):
         """
@@ -178,61 +221,73 @@ class SnipeService:
             tasks: 该日期的任务列表
         """
         try:
-            # 为每个任务创建预订实例
-            reservations = []
-            for task in tasks:
-                config = {"token": task.user_token}
-                reservation = SeatReservation(config)
-                reservations.append(reservation)
+            # 所有任务共用一个预订实例，预订时按任务传入各自的 token
+            reservation = SeatReservation({"token": tasks[0].user_token})
             
-            # 获取可用时间段
+            # 获取可用时间段；预订接口为阻塞式 HTTP 调用，放到线程中执行以免阻塞事件循环
             date_str = target_date.strftime("%Y-%m-%d")
-            periods = reservations[0].get_available_periods(date_str)
+            periods = await asyncio.to_thread(reservation.get_available_periods, date_str)
             
             if not periods:
-                logger.debug(f"日期 {date_str} 没有可用时间段")
+                logger.debug("日期 {} 没有可用时间段", date_str)
                 return
             
+            # 捡漏只针对第一个时间段，完整起止时间只拼接一次
+            start_time = periods[0]["startTime"]
+            end_time = periods[0]["endTime"]
+            period_str = f"{start_time}-{end_time}"
+            period_bounds = (f"{date_str} {start_time}", f"{date_str} {end_time}")
+            
             # 获取所有区域
-            areas = reservations[0].get_areas()
-            logger.debug(f"获取到 {len(areas)} 个区域")
+            areas = await asyncio.to_thread(reservation.get_areas)
+            logger.debug("获取到 {} 个区域", len(areas))
             
-            # 尝试为每个区域预订座位
-            for area in areas:
-                area_id = str(area["areaId"])
-                area_name = area["areaName"]
-                
-                # 获取区域座位
-                seats = reservations[0].get_area_seats(
-                    area_id=area_id,
-                    start_time=periods[0]["startTime"],
-                    end_time=periods[0]["endTime"]
+            # 并发获取所有区域的座位
+            seats_per_area = await asyncio.gather(*(
+                asyncio.to_thread(
+                    reservation.get_area_seats,
+                    area_id=str(area["id"]),
+                    start_time=start_time,
+                    end_time=end_time,
+                    area_name=area["areaName"],
+                    date=date_str,
+                    period_bounds=period_bounds
                 )
+                for area in areas
+            ))
+            
+            # 按区域优先级尝试为每个区域预订座位
+            for area, seats in zip(areas, seats_per_area):
+                area_id = str(area["id"])
+                area_name = area["areaName"]
                 
                 if not seats:
-                    logger.debug(f"区域 {area_name} 没有座位信息")
+                    logger.debug("区域 {} 没有座位信息", area_name)
                     continue
                 
                 # 尝试为每个用户预订座位
                 available_seats = [s for s in seats if s["seatStatus"] == 3]  # 状态3表示空座位
-                logger.debug(f"区域 {area_name} 有 {len(available_seats)} 个空座位")
+                logger.debug("区域 {} 有 {} 个空座位", area_name, len(available_seats))
                 
-                for i, (task, reservation) in enumerate(zip(tasks, reservations)):
+                for i, task in enumerate(tasks):
                     if i >= len(available_seats):
-                        logger.debug(f"区域 {area_name} 座位不足，剩余 {len(tasks) - i} 个用户未分配座位")
+                        logger.debug("区域 {} 座位不足，剩余 {} 个用户未分配座位", area_name, len(tasks) - i)
                         break
                         
                     seat = available_seats[i]
                     try:
-                        result = reservation.reserve_seat(
+                        result = await asyncio.to_thread(
+                            reservation.reserve_seat,
                             area_id=area_id,
                             seat_id=seat["seatId"],
                             seat_row_column=seat["seatRowColumn"],
-                            start_time=periods[0]["startTime"],
-                            end_time=periods[0]["endTime"],
+                            start_time=start_time,
+                            end_time=end_time,
                             date=date_str,
-                            period=f"{periods[0]['startTime']}-{periods[0]['endTime']}",
-                            area_name=area_name
+                            period=period_str,
+                            area_name=area_name,
+                            token=task.user_token,
+                            period_bounds=period_bounds
                         )
                         
                         if result.get("status") == "success":
@@ -241,7 +296,7 @@ class SnipeService:
                                 f"捡漏成功: "
                                 f"用户={task.user_name}({task.user_token}), "
                                 f"日期={date_str}, "
-                                f"时间段={periods[0]['startTime']}-{periods[0]['endTime']}, "
+                                f"时间段={period_str}, "
                                 f"座位={area_name} {seat['seatRow']}排 {seat['seatNo']}号"
                             )
                     
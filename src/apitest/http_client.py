@@ -0,0 +1,64 @@
+"""
+共享 HTTP 客户端模块
+"""
+from typing import Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 进程内共享的客户端，复用 keep-alive 连接
+_async_client: Optional[httpx.AsyncClient] = None
+_session: Optional[requests.Session] = None
+
+# 同步请求的超时时间：(连接超时, 读取超时)，单位秒
+REQUEST_TIMEOUT = (3, 10)
+
+
+def get_client() -> httpx.AsyncClient:
+    """获取共享的异步 HTTP 客户端"""
+    global _async_client
+    if _async_client is None or _async_client.is_closed:
+        _async_client = httpx.AsyncClient(
+            http2=True,  # 多个用户的签到请求复用同一连接
+            limits=httpx.Limits(
+                max_connections=64,
+                max_keepalive_connections=32,
+                keepalive_expiry=30.0
+            ),
+            timeout=httpx.Timeout(connect=3.0, read=10.0, write=5.0, pool=5.0)
+        )
+    return _async_client
+
+
+def get_session() -> requests.Session:
+    """获取共享的同步 HTTP 会话"""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        # 网关错误时自动重试幂等请求；预订的POST请求由调用方自行决定是否重试
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=16,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.2,
+                status_forcelist=[429, 502, 503, 504],  # 429 时遵循 Retry-After
+                raise_on_status=False  # 重试耗尽后返回最后的响应，由调用方按状态码处理
+            )
+        )
+        _session.mount("https://", adapter)
+        _session.mount("http://", adapter)
+    return _session
+
+
+async def close_clients() -> None:
+    """关闭共享的 HTTP 客户端，释放连接池"""
+    global _async_client, _session
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+    if _session is not None:
+        _session.close()
+        _session = None
@@ -0,0 +1,65 @@
+"""
+日志配置模块
+"""
+from functools import lru_cache
+from typing import Any, Iterable, Mapping, Optional
+
+from loguru import logger
+
+from .config.settings import Settings
+
+# 预订结果日志模板
+_RESULT_FORMAT = (
+    "用户: {user_name}, 日期: {date}, 时间段: {time_period}, "
+    "区域: {area}, 座位: {seat}, 状态: {status}"
+)
+
+# 已注册的文件日志 sink ID，保证全局只存在一个文件 sink
+_file_sink_id: Optional[int] = None
+
+
+def configure_logging(settings: Settings, log_level: Optional[str] = None) -> None:
+    """配置文件日志 sink
+
+    重复调用时会先移除之前注册的文件 sink，避免同一条日志被写入多次。
+
+    Args:
+        settings: 应用配置
+        log_level: 日志级别，如果为 None 则使用配置文件中的设置
+    """
+    global _file_sink_id
+
+    if _file_sink_id is not None:
+        logger.remove(_file_sink_id)
+
+    _file_sink_id = logger.add(
+        "logs/app.log",
+        rotation=settings.log_rotation,
+        retention=settings.log_retention,
+        level=log_level or settings.log_level,
+        encoding=settings.log_encoding,
+        enqueue=True  # 由后台线程写文件，记录日志时不阻塞在磁盘 I/O 上
+    )
+
+
+@lru_cache(maxsize=None)
+def _site_logger(depth: int) -> Any:
+    """获取按调用深度绑定、参数延迟求值的 logger，避免每次记录都重新构造"""
+    return logger.opt(depth=depth, lazy=True)
+
+
+def log_reservation_results(results: Iterable[Mapping[str, Any]], date: str) -> None:
+    """将一批预订结果合并为一条日志记录，日志位置指向调用方
+
+    日志内容只在有 sink 接收 INFO 级别时才会拼接。
+
+    Args:
+        results: 预订结果列表
+        date: 预订日期
+    """
+    results = list(results)
+    if results:
+        _site_logger(1).info(
+            "预订结果:\n{}",
+            lambda: "\n".join(_RESULT_FORMAT.format_map({**result, "date": date}) for result in results)
+        )
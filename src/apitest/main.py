@@ -1,60 +1,97 @@
 """
 主入口模块
 """
-from typing import Dict, Any, List, Optional
+from typing import TYPE_CHECKING, Dict, Any, Optional
 from pathlib import Path
-from datetime import datetime
+from datetime import date as Date
 from contextlib import asynccontextmanager
+import importlib
 
 import click
-import yaml
 from loguru import logger
-import uvicorn
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
 
-from .core.seat_reservation import SeatReservation, ReservationResult
-from .config.settings import settings
-from .api import endpoints
-from .api import snipe_endpoints
-from .api import schedule_endpoints
-from .api import checkin_endpoints
+from .config.settings import settings, parse_yaml, check_yaml_syntax
+from .logging_setup import configure_logging, log_reservation_results
+
+if TYPE_CHECKING:
+    from fastapi import FastAPI
+
+# FastAPI、uvicorn、各服务和路由只在需要时导入，validate 等轻量命令无需加载
+
+# 需要注册的路由模块（位于 api 包下），按注册顺序排列
+ROUTER_MODULES = ("endpoints", "snipe_endpoints", "schedule_endpoints", "checkin_endpoints")
+
 
 @asynccontextmanager
-async def lifespan(app: FastAPI):
+async def lifespan(app: "FastAPI"):
     """应用生命周期管理"""
+    from .core.schedule_service import ScheduleService
+    from .core.snipe_service import SnipeService
+    from .core.checkin_service import CheckinService
+    from .http_client import close_clients
+    
     # 启动时的处理
-    await schedule_endpoints.schedule_service.initialize()
+    app.state.schedule_service = ScheduleService()
+    app.state.snipe_service = SnipeService()
+    app.state.checkin_service = CheckinService(app.state.schedule_service)
+    await app.state.schedule_service.initialize()
     logger.info("应用启动：调度器初始化完成")
     
-    yield
+    try:
+        yield
+    finally:
+        # 关闭时的处理
+        app.state.snipe_service.shutdown()
+        await app.state.schedule_service.flush_user_tokens()
+        app.state.schedule_service.shutdown()
+        await close_clients()
+        logger.info("应用关闭：调度器已停止")
+
+
+async def root():
+    """根路由"""
+    return {"message": "座位预订API服务"}
+
+
+def _build_app() -> "FastAPI":
+    """创建FastAPI应用并注册中间件和路由"""
+    from fastapi import FastAPI
+    from fastapi.middleware.cors import CORSMiddleware
+    from fastapi.responses import ORJSONResponse
+    
+    # 创建FastAPI应用
+    app = FastAPI(
+        title="图书馆座位预订系统",
+        description="自动预订图书馆座位的API服务",
+        version="1.0.0",
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse
+    )
     
-    # 关闭时的处理
-    schedule_endpoints.schedule_service.shutdown()
-    logger.info("应用关闭：调度器已停止")
-
-# 创建FastAPI应用
-app = FastAPI(
-    title="图书馆座位预订系统",
-    description="自动预订图书馆座位的API服务",
-    version="1.0.0",
-    lifespan=lifespan
-)
+    # 配置CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    
+    # 注册路由，路由模块在创建应用时才导入
+    for name in ROUTER_MODULES:
+        app.include_router(importlib.import_module(f".api.{name}", __package__).router)
+    app.get("/")(root)
+    return app
 
-# 配置CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
-# 注册路由
-app.include_router(endpoints.router)
-app.include_router(snipe_endpoints.router)
-app.include_router(schedule_endpoints.router)
-app.include_router(checkin_endpoints.router)
+def __getattr__(name: str) -> Any:
+    """兼容 `apitest.main:app` 的用法，首次访问时才创建应用"""
+    if name == "app":
+        app = _build_app()
+        globals()["app"] = app
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 def init_logger(log_level: Optional[str] = None) -> None:
     """初始化日志配置
@@ -62,13 +99,7 @@ def init_logger(log_level: Optional[str] = None) -> None:
     Args:
         log_level: 日志级别，如果为 None 则使用配置文件中的设置
     """
-    logger.add(
-        "logs/app.log",
-        rotation=settings.log_rotation,
-        retention=settings.log_retention,
-        level=log_level or settings.log_level,
-        encoding=settings.log_encoding
-    )
+    configure_logging(settings, log_level)
 
 
 @click.group()
@@ -99,8 +130,19 @@ def cli() -> None:
 )
 def serve(host: str, port: int, log_level: Optional[str]) -> None:
     """启动API服务器"""
+    import uvicorn
+    
     init_logger(log_level)
-    uvicorn.run(app, host=host, port=port)
+    uvicorn.run(_build_app(), host=host, port=port)
+
+
+def _check_iso_date(ctx: click.Context, param: click.Parameter, value: str) -> str:
+    """校验日期参数为 YYYY-MM-DD 格式，原样返回字符串"""
+    try:
+        Date.fromisoformat(value)
+    except ValueError:
+        raise click.BadParameter(f"日期格式应为 YYYY-MM-DD: {value}")
+    return value
 
 
 @cli.command()
@@ -119,30 +161,29 @@ def serve(host: str, port: int, log_level: Optional[str]) -> None:
 )
 @click.option(
     "--date",
-    type=click.DateTime(formats=["%Y-%m-%d"]),
-    default=lambda: datetime.now().strftime("%Y-%m-%d"),
+    type=str,
+    default=lambda: Date.today().isoformat(),
+    callback=_check_iso_date,
     help="预订日期，格式：YYYY-MM-DD",
-    show_default=True
+    show_default="今天"
 )
-def reserve(config: Path, log_level: Optional[str], date: datetime) -> None:
+def reserve(config: Path, log_level: Optional[str], date: str) -> None:
     """
     执行座位预订
     
     Args:
         config: 用户配置文件路径
         log_level: 日志级别
-        date: 预订日期
+        date: 预订日期，格式为 YYYY-MM-DD
     """
+    from .core.seat_reservation import SeatReservation
+    
     init_logger(log_level)
     
     try:
         # 读取用户配置
-        with open(config, "r", encoding="utf-8") as f:
-            config_data: Dict[str, Any] = yaml.safe_load(f)
-            
-        # 添加日期信息到配置中
-        formatted_date = date.strftime("%Y-%m-%d")
-        
+        config_data: Dict[str, Any] = parse_yaml(config.read_bytes())
+
         # 获取用户列表
         users_config = config_data.get("users", [])
         if not users_config:
@@ -151,21 +192,17 @@ def reserve(config: Path, log_level: Optional[str], date: datetime) -> None:
             
         # 创建预订实例并执行预订
         reservation = SeatReservation({"headers": users_config[0]["headers"]})  # 使用第一个用户的 headers 初始化
-        results = reservation.make_reservation(users_config)
+        results = reservation.make_reservation(users_config, date)
         
         # 打印预订结果
-        for result in results:
-            logger.info(
-                f"日期: {formatted_date}, "
-                f"时间段: {result['time_period']}, "
-                f"区域: {result['area']}, "
-                f"座位: {result['seat']}, "
-                f"状态: {result['status']}"
-            )
+        log_reservation_results(results, date)
             
     except Exception as e:
         logger.error(f"程序执行出错: {str(e)}")
         raise click.ClickException(str(e))
+    finally:
+        # 文件日志由后台线程写入，退出前等待队列中的日志写完
+        logger.complete()
 
 
 @cli.command()
@@ -183,8 +220,7 @@ def validate(config: Path) -> None:
         config: 用户配置文件路径
     """
     try:
-        with open(config, "r", encoding="utf-8") as f:
-            yaml.safe_load(f)  # 只验证文件格式，不需要使用返回值
+        check_yaml_syntax(config.read_bytes())  # 只验证文件格式，不需要构造配置对象
         click.echo(f"配置文件 {config} 格式正确")
         click.echo("当前配置:")
         click.echo(f"API URL: {settings.api_base_url}")
@@ -195,11 +231,5 @@ def validate(config: Path) -> None:
         raise click.ClickException(f"配置文件格式错误: {str(e)}")
 
 
-@app.get("/")
-async def root():
-    """根路由"""
-    return {"message": "座位预订API服务"}
-
-
 if __name__ == "__main__":
     cli() 
\ No newline at end of file
@@ -2,11 +2,13 @@
 签到签退相关模型
 """
 from typing import Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class CheckinResult(BaseModel):
     """签到/签退结果模型"""
+    model_config = ConfigDict(frozen=True)  # 创建后不再修改
+    
     user_name: str = Field(..., description="用户姓名")
     date: str = Field(..., description="预约日期")
     time_period: str = Field(..., description="时间段")
@@ -1,12 +1,39 @@
-from typing import Dict, List, Any, Optional
-from pydantic import BaseModel, Field
+from typing import ClassVar, Dict, List, Any, Optional
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime
-from pathlib import Path
-import yaml
+import copy
+
+
+# 配置中不存在对应键时的标记
+_MISSING = object()
+
+
+def _lookup(config: Dict[str, Any], key_path: str, default_value: Any = None) -> Any:
+    """在已解析的配置中按点分路径取值，列表和字典返回副本"""
+    value: Any = config
+    for key in key_path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return default_value
+        value = value[key]
+    # 解析结果是共享的缓存，列表和字典返回副本，避免模型实例之间相互影响
+    if isinstance(value, (list, dict)):
+        return copy.deepcopy(value)
+    return value
+
+
+def _load_config() -> Dict[str, Any]:
+    """获取缓存的 config.yaml 内容，读取失败时返回空字典"""
+    # 避免循环导入：settings 模块会导入本模块
+    from ..config.settings import load_yaml_config
+    
+    try:
+        return load_yaml_config()
+    except Exception:
+        return {}
 
 
 def get_config_value(key_path: str, default_value: Any = None) -> Any:
-    """从config.yaml获取配置值
+    """从config.yaml获取配置值，配置文件只在修改后才重新解析
     
     Args:
         key_path: 配置键路径，例如 "api.base_url" 或 "logging.level"
@@ -15,24 +42,31 @@ def get_config_value(key_path: str, default_value: Any = None) -> Any:
     Returns:
         配置值或默认值
     """
-    config_path = Path(__file__).parent.parent / "config" / "config.yaml"
-    if not config_path.exists():
-        return default_value
-        
-    try:
-        with open(config_path, "r", encoding="utf-8") as f:
-            config = yaml.safe_load(f)
-            
-        # 处理嵌套键
-        keys = key_path.split(".")
-        value = config
-        for key in keys:
-            if not isinstance(value, dict) or key not in value:
-                return default_value
-            value = value[key]
-        return value
-    except Exception:
-        return default_value
+    return _lookup(_load_config(), key_path, default_value)
+
+
+class ConfigDefaultsModel(BaseModel):
+    """未提供的字段统一从config.yaml补全默认值的模型基类"""
+    
+    # 字段名 -> 配置键路径，配置中不存在时使用字段声明的默认值
+    _CONFIG_DEFAULTS: ClassVar[Dict[str, str]] = {}
+    
+    @model_validator(mode="before")
+    @classmethod
+    def _fill_from_config(cls, data: Any) -> Any:
+        """一次读取配置，补全所有未提供的字段"""
+        if not isinstance(data, dict):
+            return data
+        missing = [name for name in cls._CONFIG_DEFAULTS if name not in data]
+        if not missing:
+            return data
+        config = _load_config()
+        data = dict(data)
+        for name in missing:
+            value = _lookup(config, cls._CONFIG_DEFAULTS[name], _MISSING)
+            if value is not _MISSING:
+                data[name] = value
+        return data
 
 
 class UserConfig(BaseModel):
@@ -45,50 +79,67 @@ class UserConfig(BaseModel):
         return {"token": self.token}
 
 
-class ApiConfig(BaseModel):
+class ApiConfig(ConfigDefaultsModel):
     """API配置模型"""
+    _CONFIG_DEFAULTS: ClassVar[Dict[str, str]] = {
+        "base_url": "api.base_url",
+        "floor_id": "api.floor_id",
+        "library_id": "api.library_id",
+        "seat_reservation_type": "api.seat_reservation_type",
+        "period_reservation_type": "api.period_reservation_type",
+        "reservation_interval": "api.reservation_interval",
+    }
+    
     base_url: str = Field(
-        default_factory=lambda: get_config_value("api.base_url", "https://yuyue.library.sh.cn"),
+        default="https://yuyue.library.sh.cn",
         description="基础URL",
         example="https://yuyue.library.sh.cn"
     )
     floor_id: str = Field(
-        default_factory=lambda: get_config_value("api.floor_id", "4"),
+        default="4",
         description="楼层ID",
         example="4"
     )
     library_id: str = Field(
-        default_factory=lambda: get_config_value("api.library_id", "1"),
+        default="1",
         description="图书馆ID",
         example="1"
     )
     seat_reservation_type: str = Field(
-        default_factory=lambda: get_config_value("api.seat_reservation_type", "2"),
+        default="2",
         description="座位预订类型",
         example="2"
     )
     period_reservation_type: str = Field(
-        default_factory=lambda: get_config_value("api.period_reservation_type", "14"),
+        default="14",
         description="时间段预订类型",
         example="14"
     )
     reservation_interval: int = Field(
-        default_factory=lambda: get_config_value("api.reservation_interval", 500),
+        default=500,
         description="预订请求间隔（毫秒）",
         example=500
     )
 
 
-class ReservationConfig(BaseModel):
+class ReservationConfig(ConfigDefaultsModel):
     """预订配置模型"""
+    _CONFIG_DEFAULTS: ClassVar[Dict[str, str]] = {
+        "days_ahead": "reservation.days_ahead",
+    }
+    
     days_ahead: int = Field(
-        default_factory=lambda: get_config_value("reservation.days_ahead", 6),
+        default=6,
         description="预订提前天数"
     )
 
 
-class ReservationRequest(BaseModel):
+class ReservationRequest(ConfigDefaultsModel):
     """预订请求模型"""
+    _CONFIG_DEFAULTS: ClassVar[Dict[str, str]] = {
+        "area_priority": "area_priority",
+    }
+    
     users: List[UserConfig] = Field(
         ..., 
         description="用户配置列表",
@@ -101,7 +152,7 @@ class ReservationRequest(BaseModel):
     )
     api: ApiConfig = Field(default_factory=ApiConfig, description="API配置")
     area_priority: List[str] = Field(
-        default_factory=lambda: get_config_value("area_priority", ["西", "东", "北", "南"]),
+        default=["西", "东", "北", "南"],
         description="区域优先级",
         example=["西", "东", "北", "南"]
     )
@@ -117,6 +168,16 @@ class ReservationRequest(BaseModel):
     )
 
 
+class BatchReservationRequest(BaseModel):
+    """批量预订请求模型"""
+    items: List[ReservationRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=100,
+        description="预订请求列表，按顺序依次处理"
+    )
+
+
 class TokenUser(BaseModel):
     """Token用户模型"""
     token: str = Field(..., description="用户token")
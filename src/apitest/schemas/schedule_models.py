@@ -1,6 +1,6 @@
 from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 class UserToken(BaseModel):
     """用户Token信息"""
@@ -21,6 +21,8 @@ class ScheduleConfig(BaseModel):
 
 class ScheduleStatus(BaseModel):
     """定时任务状态"""
+    model_config = ConfigDict(frozen=True)  # 每次查询时重新生成，创建后不再修改
+    
     is_running: bool = Field(..., description="是否正在运行")
     next_run_time: Optional[datetime] = Field(None, description="下次运行时间")
     last_run_time: Optional[datetime] = Field(None, description="上次运行时间")
@@ -1,7 +1,7 @@
 from datetime import date
 from enum import Enum
 from typing import List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class TaskStatus(str, Enum):
@@ -13,6 +13,8 @@ class TaskStatus(str, Enum):
 
 class TaskInfo(BaseModel):
     """任务信息"""
+    model_config = ConfigDict(frozen=True)  # 请求数据，创建后不再修改
+    
     user_token: str = Field(
         ..., 
         description="用户token",
@@ -1,18 +1,23 @@
 """
 工具函数模块
 """
-from datetime import datetime, timedelta
-from typing import List, Dict
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Dict, Tuple
 import hashlib
+import re
 import time
 
 from ..config.settings import settings
 
+# 座位排号："排"字之前的数字，允许两侧有空白
+_ROW_NUMBER_RE = re.compile(r"\s*(\d+)\s*(?:排|$)")
+
 
 def get_target_date() -> str:
-    """获取目标日期"""
-    target_date = datetime.now() + timedelta(days=settings.days_ahead)
-    return target_date.strftime("%Y-%m-%d")
+    """获取目标日期，格式为 YYYY-MM-DD"""
+    target_date = date.today() + timedelta(days=settings.days_ahead)
+    return target_date.isoformat()
 
 
 def generate_sign(client_id: str, access_token: str, timestamp: str) -> str:
@@ -27,37 +32,29 @@ def generate_sign(client_id: str, access_token: str, timestamp: str) -> str:
     Returns:
         生成的签名
     """
-    # 按照特定顺序拼接参数
-    sign_str = f"{client_id}{access_token}{timestamp}"
-    # 使用SHA256生成签名
-    return hashlib.sha256(sign_str.encode()).hexdigest()
+    # 按照特定顺序拼接参数，使用SHA256生成签名；固定前缀的哈希状态可复用，只需追加时间戳
+    sign = _sign_prefix(client_id, access_token).copy()
+    sign.update(timestamp.encode())
+    return sign.hexdigest()
 
 
-def update_request_headers(headers: Dict[str, str], force_update: bool = False) -> Dict[str, str]:
-    """
-    更新请求头信息
-    
-    Args:
-        headers: 原始请求头
-        force_update: 是否强制更新，默认为False
-        
-    Returns:
-        更新后的请求头
-    """
-    new_headers = {}
-    
-    # 只保留token参数
-    if "token" in headers:
-        new_headers["token"] = headers["token"]
-    
-    # 添加标准HTTP请求头
-    new_headers.update({
+@lru_cache(maxsize=64)
+def _sign_prefix(client_id: str, access_token: str) -> "hashlib._Hash":
+    """已输入 client_id 和 access_token 的SHA256状态，调用方需先 copy() 再使用"""
+    return hashlib.sha256(f"{client_id}{access_token}".encode())
+
+
+@lru_cache(maxsize=4)
+def _standard_headers(api_base_url: str) -> Dict[str, str]:
+    """与 token 无关的标准HTTP请求头，按接口地址缓存，调用方不得修改返回值"""
+    return {
         "Accept": "application/json, text/plain, */*",
         "Accept-Language": "zh-CN,zh;q=0.9",
+        "Accept-Encoding": "gzip, deflate",  # 座位列表等JSON响应压缩传输，由 urllib3 透明解压
         "Content-Type": "application/json",
-        "Origin": settings.api_base_url,
-        "Referer": f"{settings.api_base_url}/",
-        "Host": settings.api_base_url.replace("https://", ""),
+        "Origin": api_base_url,
+        "Referer": f"{api_base_url}/",
+        "Host": api_base_url.replace("https://", ""),
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
         "Connection": "keep-alive",
         "Sec-Ch-Ua": '"Not_A Brand";v="8", "Chromium";v="120", "Google Chrome";v="120"',
@@ -66,26 +63,59 @@ def update_request_headers(headers: Dict[str, str], force_update: bool = False)
         "Sec-Fetch-Dest": "empty",
         "Sec-Fetch-Mode": "cors",
         "Sec-Fetch-Site": "same-origin"
-    })
+    }
+
+
+def update_request_headers(headers: Dict[str, str], force_update: bool = False) -> Dict[str, str]:
+    """
+    更新请求头信息
+    
+    Args:
+        headers: 原始请求头
+        force_update: 是否强制更新，默认为False
+        
+    Returns:
+        更新后的请求头
+    """
+    standard = _standard_headers(settings.api_base_url)
     
-    return new_headers
+    # 只保留token参数，其余为标准HTTP请求头
+    token = headers.get("token")
+    if token is None:
+        return dict(standard)
+    return {"token": token, **standard}
 
 
 def parse_seat_row_number(seat_row: str) -> int:
-    """解析座位排号"""
-    try:
-        return int(seat_row.split("排")[0])
-    except (ValueError, IndexError):
-        return 0
+    """解析座位排号，如 "3排" 解析为 3，无法解析时返回0"""
+    match = _ROW_NUMBER_RE.match(seat_row)
+    return int(match.group(1)) if match else 0
+
+
+@lru_cache(maxsize=1024)
+def split_seat_row_column(seat_row_column: str) -> Tuple[str, str]:
+    """
+    解析座位行列号
+    
+    Args:
+        seat_row_column: 座位行列号，如 "3排 4号"
+        
+    Returns:
+        (桌号, 座位号)，如 ("3", "4")
+    """
+    table_number, _, seat = seat_row_column.partition("排")
+    seat_no = seat.partition("号")[0].strip()
+    return table_number, str(int(seat_no))
 
 
-def get_preferred_seats(max_seat_no: int) -> List[int]:
-    """获取优先座位顺序"""
+@lru_cache(maxsize=16)
+def get_preferred_seats(max_seat_no: int) -> Tuple[int, ...]:
+    """获取优先座位顺序，结果按最大座位号缓存"""
     if max_seat_no == 4:
-        return [4, 3, 2, 1]
+        return (4, 3, 2, 1)
     elif max_seat_no == 6:
-        return [6, 5, 4, 3, 2, 1]
-    return list(range(max_seat_no, 0, -1))
+        return (6, 5, 4, 3, 2, 1)
+    return tuple(range(max_seat_no, 0, -1))
 
 
 def is_odd_table(row: str) -> bool:
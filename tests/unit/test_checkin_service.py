@@ -0,0 +1,96 @@
+"""
+签到服务单元测试
+"""
+import asyncio
+from datetime import datetime
+from unittest.mock import Mock
+
+import pytest
+
+from src.apitest.core import checkin_service as checkin_module
+from src.apitest.core.checkin_service import CheckinService
+
+TODAY = "2024-02-13"
+
+
+def _reservation(reservation_id, start, end, status="待签到"):
+    """构造预约记录"""
+    return {
+        "reservationId": reservation_id,
+        "startTime": start,
+        "endTime": end,
+        "reservationStatusName": status
+    }
+
+
+@pytest.fixture
+def reservations():
+    """当天的预约列表，故意不按开始时间排序"""
+    return {
+        TODAY: [
+            _reservation("c", "17:00", "21:00"),
+            _reservation("a", "08:00", "12:00"),
+            _reservation("b", "12:00", "16:00"),
+            _reservation("x", "16:00", "17:00", status="已签退")
+        ]
+    }
+
+
+@pytest.fixture
+def service():
+    """签到服务fixture"""
+    return CheckinService(Mock())
+
+
+def _freeze_now(monkeypatch, hhmm):
+    """将模块内的当前时间固定为当天的 hhmm"""
+    hour, minute = map(int, hhmm.split(":"))
+    frozen = datetime(2024, 2, 13, hour, minute)
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return frozen
+
+    monkeypatch.setattr(checkin_module, "datetime", FrozenDatetime)
+
+
+@pytest.mark.parametrize("now, expected", [("08:00", "a"), ("12:00", "b"), ("17:00", "c")])
+def test_checkout_exact_start(monkeypatch, service, reservations, now, expected):
+    """测试当前时间恰好等于开始时间时选中该预约"""
+    _freeze_now(monkeypatch, now)
+    reservation = service._get_closest_reservation(reservations, TODAY, for_checkout=True)
+    assert reservation["reservationId"] == expected
+
+
+def test_checkout_before_all(monkeypatch, service, reservations):
+    """测试当前时间早于所有预约时没有可签退的预约"""
+    _freeze_now(monkeypatch, "07:59")
+    assert service._get_closest_reservation(reservations, TODAY, for_checkout=True) is None
+
+
+def test_checkout_after_all(monkeypatch, service, reservations):
+    """测试当前时间晚于所有预约时没有可签退的预约"""
+    _freeze_now(monkeypatch, "21:01")
+    assert service._get_closest_reservation(reservations, TODAY, for_checkout=True) is None
+
+
+def test_checkout_skips_filtered_status(monkeypatch, service, reservations):
+    """测试已签退的预约不会被选中"""
+    _freeze_now(monkeypatch, "16:30")
+    assert service._get_closest_reservation(reservations, TODAY, for_checkout=True) is None
+
+
+def test_reservation_cache_prunes_past_dates(monkeypatch, service):
+    """测试写入缓存时移除过去日期的条目"""
+    async def fetch(token):
+        return [{"reservationDate": TODAY, "reservationList": [_reservation("a", "08:00", "12:00")]}]
+
+    monkeypatch.setattr(service, "_fetch_reservation_list", fetch)
+    service._reservation_cache[("t1", "2024-02-11")] = (0.0, {})
+    service._reservation_cache[("t2", "2024-02-12")] = (0.0, {})
+    service._reservation_cache[("t2", "2024-02-14")] = (0.0, {})
+
+    asyncio.run(service._get_cached_reservation_list(("t1", TODAY)))
+
+    assert set(service._reservation_cache) == {("t1", TODAY), ("t2", "2024-02-14")}
@@ -0,0 +1,72 @@
+"""
+预订接口单元测试
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.apitest.api import endpoints
+from src.apitest.config.settings import Settings
+
+
+class FakeReservation:
+    """记录调用顺序的预订实例，用户名为 fail 时返回空结果"""
+    calls = []
+
+    def __init__(self, config):
+        self.config = config
+
+    def make_reservation(self, users_config, target_date=None):
+        name = users_config[0].name
+        self.calls.append((name, target_date))
+        if name == "fail":
+            return []
+        return [{
+            "time_period": "08:00-12:00",
+            "area": "西",
+            "seat": "3-4",
+            "status": "成功",
+            "user_name": name
+        }]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """只挂载预订路由的测试客户端，预订实例和全局设置更新均被替换"""
+    FakeReservation.calls = []
+    monkeypatch.setattr(endpoints, "SeatReservation", FakeReservation)
+    monkeypatch.setattr(Settings, "update_from_request", lambda self, request: None)
+    app = FastAPI()
+    app.include_router(endpoints.router)
+    return TestClient(app)
+
+
+def test_reserve_batch(client):
+    """测试批量预订按顺序执行、使用各自的目标日期并返回未成功的序号"""
+    items = [
+        {"users": [{"name": "a", "token": "t1"}], "target_date": "2024-02-13T00:00:00"},
+        {
+            "users": [{"name": "fail", "token": "t2"}],
+            "target_date": "2024-02-14T00:00:00",
+            "area_priority": ["东"]
+        },
+        {
+            "users": [{"name": "c", "token": "t3"}],
+            "target_date": "2024-02-15T00:00:00",
+            "api": {"floor_id": "5"}
+        }
+    ]
+
+    response = client.post("/reserve/batch", json={"items": items})
+    assert response.status_code == 200
+    body = response.json()
+
+    assert FakeReservation.calls == [
+        ("a", "2024-02-13"),
+        ("fail", "2024-02-14"),
+        ("c", "2024-02-15")
+    ]
+    assert [result["success"] for result in body["results"]] == [True, False, True]
+    assert body["results"][2]["results"][0]["user_name"] == "c"
+    assert body["unserviced"] == [1]
+    assert body["success"] is False
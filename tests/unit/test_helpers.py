@@ -0,0 +1,46 @@
+"""
+工具函数单元测试
+"""
+import pytest
+
+from src.apitest.utils.helpers import parse_seat_row_number, split_seat_row_column
+
+
+@pytest.mark.parametrize("seat_row, expected", [
+    ("3排", 3),
+    ("3排 4号", 3),
+    (" 5 排", 5),
+    ("7", 7)
+])
+def test_parse_seat_row_number(seat_row, expected):
+    """测试解析常规排号"""
+    assert parse_seat_row_number(seat_row) == expected
+
+
+@pytest.mark.parametrize("seat_row, expected", [("12排", 12), ("105排 2号", 105)])
+def test_parse_seat_row_number_multi_digit(seat_row, expected):
+    """测试解析多位数排号"""
+    assert parse_seat_row_number(seat_row) == expected
+
+
+@pytest.mark.parametrize("seat_row", ["", "排", "A3排", "3号", "三排"])
+def test_parse_seat_row_number_malformed(seat_row):
+    """测试无法解析的排号返回0"""
+    assert parse_seat_row_number(seat_row) == 0
+
+
+@pytest.mark.parametrize("seat_row_column, expected", [
+    ("3排 4号", ("3", "4")),
+    ("12排 06号", ("12", "6")),
+    ("3排4号", ("3", "4"))
+])
+def test_split_seat_row_column(seat_row_column, expected):
+    """测试拆分带分隔符的座位行列号"""
+    assert split_seat_row_column(seat_row_column) == expected
+
+
+@pytest.mark.parametrize("seat_row_column", ["3 4号", "34"])
+def test_split_seat_row_column_without_separator(seat_row_column):
+    """测试缺少"排"分隔符时无法得到座位号"""
+    with pytest.raises(ValueError):
+        split_seat_row_column(seat_row_column)
@@ -0,0 +1,61 @@
+"""
+定时预订服务单元测试
+"""
+import asyncio
+
+import orjson
+import pytest
+
+from src.apitest.core import schedule_service as schedule_module
+from src.apitest.core.schedule_service import ScheduleService
+from src.apitest.schemas.schedule_models import UserToken
+
+
+@pytest.fixture
+def service(tmp_path):
+    """不经过单例初始化、token文件位于临时目录的服务实例"""
+    service = object.__new__(ScheduleService)
+    service._tokens_by_name = {}
+    service._last_serialized = None
+    service._save_lock = asyncio.Lock()
+    service._save_handle = None
+    service._save_task = None
+    service.last_run_time = None
+    service.last_run_result = None
+    service._token_path = tmp_path / "user_tokens.json"
+    return service
+
+
+def test_schedule_task_counts_successes(monkeypatch, service):
+    """测试成功和失败混合时只统计状态以"成功"开头的结果"""
+    results = [
+        {"user_name": "a", "time_period": "08:00-12:00", "area": "西", "seat": "3-4", "status": "成功 - 预约成功"},
+        {"user_name": "b", "time_period": "08:00-12:00", "area": "西", "seat": "3-3", "status": "失败 - 座位已被预约"},
+        {"user_name": "c", "time_period": "12:00-16:00", "area": "东", "seat": "5-6", "status": "成功 - 预约成功"},
+        {"user_name": "d", "time_period": "12:00-16:00", "area": "东", "seat": "", "status": "失败 - 未成功预约"}
+    ]
+
+    class FakeReservation:
+        def __init__(self, config):
+            pass
+
+        def make_reservation(self, users_config):
+            return results
+
+    monkeypatch.setattr(schedule_module, "SeatReservation", FakeReservation)
+    service._set_tokens([UserToken(name="a", token="t")])
+
+    asyncio.run(service._schedule_task())
+
+    assert service.last_run_result.startswith("成功预订 2/4 个座位。")
+
+
+def test_token_changes_saved_without_event_loop(service):
+    """测试在事件循环之外修改token时同步写入文件，内存与文件保持一致"""
+    service.add_user_token(UserToken(name="a", token="t1"))
+    service.add_user_token(UserToken(name="b", token="t2"))
+    service.remove_user_token("a")
+
+    saved = orjson.loads(service._token_path.read_bytes())
+    assert saved == [{"name": "b", "token": "t2"}]
+    assert service._save_handle is None
@@ -1,64 +1,100 @@
 """
 座位预订单元测试
 """
+import random
+
+import orjson
 import pytest
-from unittest.mock import Mock, patch
-from src.apitest.core.seat_reservation import SeatReservation
+from unittest.mock import Mock
+from src.apitest.config.settings import settings
+from src.apitest.core import seat_reservation as seat_module
+from src.apitest.core.seat_reservation import SeatReservation, _retry_delay, MAX_RETRY_DELAY
+
+
+def _response(payload, status_code=200):
+    """构造返回指定 JSON 的响应"""
+    response = Mock()
+    response.status_code = status_code
+    response.content = orjson.dumps(payload)
+    response.text = response.content.decode()
+    return response
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """清空模块级缓存，避免测试之间相互影响"""
+    seat_module._AREAS_CACHE.clear()
+    yield
+    seat_module._AREAS_CACHE.clear()
+
+
+@pytest.fixture
+def session():
+    """HTTP 会话fixture"""
+    return Mock()
 
 
 @pytest.fixture
 def user_config():
     """用户配置fixture"""
     return {
-        "headers": {"Authorization": "test_token"},
+        "token": "test_token",
         "name": "test_user"
     }
 
 
 @pytest.fixture
-def seat_reservation(user_config):
+def seat_reservation(user_config, session):
     """座位预订实例fixture"""
-    return SeatReservation(user_config)
+    return SeatReservation(user_config, session=session)
 
 
-def test_get_areas(seat_reservation):
+def test_get_areas(seat_reservation, session):
     """测试获取区域信息"""
-    with patch("requests.get") as mock_get:
-        mock_response = Mock()
-        mock_response.json.return_value = {
-            "data": [
-                {"id": "1", "areaName": "南"},
-                {"id": "2", "areaName": "北"}
-            ]
-        }
-        mock_get.return_value = mock_response
-        
-        areas = seat_reservation.get_areas()
-        assert len(areas) == 2
-        assert areas[0]["areaName"] == "南"
-        assert areas[1]["areaName"] == "北"
+    session.get.return_value = _response({
+        "resultValue": [
+            {"id": "1", "areaName": "南"},
+            {"id": "2", "areaName": "北"}
+        ]
+    })
+    
+    areas = seat_reservation.get_areas()
+    # 按区域优先级排序
+    priority = list(settings.area_priority)
+    assert [area["areaName"] for area in areas] == sorted(["南", "北"], key=priority.index)
+    
+    session.get.assert_called_once()
+    args, kwargs = session.get.call_args
+    assert args[0] == settings.api_base_url + SeatReservation.AREA_PATH
+    assert kwargs["params"] == {"floorId": settings.floor_id}
+    assert kwargs["headers"]["token"] == "test_token"
 
 
-def test_get_available_periods(seat_reservation):
+def test_get_available_periods(seat_reservation, session):
     """测试获取可用时间段"""
-    with patch("requests.get") as mock_get:
-        mock_response = Mock()
-        mock_response.json.return_value = {
-            "resultValue": [
-                {
-                    "beginTime": "08:00",
-                    "endTime": "12:00",
-                    "quotaVo": {"remaining": 10}
-                }
-            ]
-        }
-        mock_get.return_value = mock_response
-        
-        periods = seat_reservation.get_available_periods("2024-02-13")
-        assert len(periods) == 1
-        assert periods[0]["startTime"] == "08:00"
-        assert periods[0]["endTime"] == "12:00"
-        assert periods[0]["remaining"] == 10
+    session.get.return_value = _response({
+        "resultValue": [
+            {
+                "beginTime": "08:00",
+                "endTime": "12:00",
+                "quotaVo": {"remaining": 10}
+            },
+            {
+                "beginTime": "12:00",
+                "endTime": "16:00",
+                "quotaVo": {"remaining": 0}
+            }
+        ]
+    })
+    
+    periods = seat_reservation.get_available_periods("2024-02-13")
+    assert periods == [{"startTime": "08:00", "endTime": "12:00", "remaining": 10}]
+    
+    session.get.assert_called_once()
+    args, kwargs = session.get.call_args
+    assert args[0] == settings.api_base_url + SeatReservation.PERIOD_PATH
+    assert kwargs["params"]["date"] == "2024-02-13"
+    assert kwargs["headers"]["token"] == "test_token"
 
 
 def test_find_best_seat(seat_reservation):
@@ -85,4 +121,34 @@ def test_find_best_seat(seat_reservation):
         "08:00-12:00"
     )
     assert best_seat is not None
-    assert best_seat["id"] == 2  # 应该选择靠右的座位 
\ No newline at end of file
+    assert best_seat["id"] == 2  # 应该选择靠右的座位
+
+
+def test_retry_delay_backoff():
+    """测试指数退避加随机抖动，并受上限约束"""
+    random.seed(1234)
+    delays = [_retry_delay(attempt, 0.5) for attempt in range(8)]
+    
+    expected_rng = random.Random(1234)
+    expected = [
+        min(MAX_RETRY_DELAY, 0.5 * 2 ** attempt) * (1 + expected_rng.uniform(0, 0.5))
+        for attempt in range(8)
+    ]
+    assert delays == expected
+    for attempt, delay in enumerate(delays):
+        backoff = min(MAX_RETRY_DELAY, 0.5 * 2 ** attempt)
+        assert backoff <= delay <= backoff * 1.5
+
+
+def test_retry_delay_retry_after():
+    """测试429响应优先使用 Retry-After，且不超过上限"""
+    response = Mock(status_code=429, headers={"Retry-After": "7"})
+    assert _retry_delay(0, 0.5, response) == 7.0
+    
+    response.headers = {"Retry-After": "120"}
+    assert _retry_delay(0, 0.5, response) == MAX_RETRY_DELAY
+    
+    # 没有可用的 Retry-After 时退回指数退避
+    random.seed(1234)
+    response.headers = {}
+    assert _retry_delay(2, 0.5, response) == 2.0 * (1 + random.Random(1234).uniform(0, 0.5))
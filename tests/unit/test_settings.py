@@ -0,0 +1,40 @@
+"""
+配置模块单元测试
+"""
+import pytest
+
+from src.apitest.config.settings import (
+    SHARED_SEAT_RECORDS,
+    _AREA_TABLE_INDEX,
+    _SEAT_RECORDS_LOCK,
+    record_seat,
+    get_booked_tables
+)
+
+
+def _clear_seat_records():
+    with _SEAT_RECORDS_LOCK:
+        SHARED_SEAT_RECORDS.clear()
+        _AREA_TABLE_INDEX.clear()
+
+
+@pytest.fixture(autouse=True)
+def clean_seat_records():
+    """每个测试前后清空已预订座位记录，避免全局状态相互影响"""
+    _clear_seat_records()
+    yield
+    _clear_seat_records()
+
+
+def test_record_seat():
+    """测试记录已预订座位"""
+    record_seat("2024-02-13", "08:00-12:00", "西", "3", "4")
+    record_seat("2024-02-13", "08:00-12:00", "西", "3", "3")
+
+    assert SHARED_SEAT_RECORDS[("2024-02-13", "08:00-12:00", "西", "3")] == ["4", "3"]
+    assert get_booked_tables("2024-02-13", "08:00-12:00", "西") == {"3": ["4", "3"]}
+
+
+def test_get_booked_tables_empty():
+    """测试没有预订记录的区域"""
+    assert get_booked_tables("2024-02-14", "08:00-12:00", "东") == {}